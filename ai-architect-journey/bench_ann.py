@@ -0,0 +1,63 @@
+from ivf_index import IVFIndex
+from vector_index import VectorIndex, normalize
+import numpy as np
+import sys
+import tempfile
+import time
+
+# ── BENCHMARK: IVF vs EXACT SEARCH ───────────────────
+# Recall@k of IVFIndex against exact VectorIndex search, and queries per
+# second, for a sweep of n_probe. Vectors are drawn around random topic
+# centres (real embeddings cluster by topic; uniform noise has no
+# neighbours worth finding). Also checks save/load round-trips.
+# Usage: python bench_ann.py [vectors] [queries] [k]
+
+DIM = 384
+TOPICS = 2000
+SPREAD = 1.0  # noise length relative to the unit topic centre
+
+def clustered_vectors(n, rng, centres):
+    topics = rng.integers(0, len(centres), n)
+    noise = rng.standard_normal((n, DIM), dtype=np.float32) * (SPREAD / np.sqrt(DIM))
+    return normalize(centres[topics] + noise)
+
+def qps(fn, n_queries):
+    start = time.perf_counter()
+    result = fn()
+    return n_queries / (time.perf_counter() - start), result
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    k = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    rng = np.random.default_rng(0)
+    centres = normalize(rng.standard_normal((TOPICS, DIM), dtype=np.float32))
+    docs = clustered_vectors(n, rng, centres)
+    queries = clustered_vectors(n_queries, rng, centres)
+
+    exact = VectorIndex(docs)
+    exact_qps, (truth, _) = qps(lambda: exact.search_many(queries, k), n_queries)
+    # one query at a time too, which is how an API would call it
+    exact_single_qps, _ = qps(lambda: [exact.search(q, k) for q in queries], n_queries)
+
+    start = time.perf_counter()
+    ivf = IVFIndex().build(docs)
+    build_seconds = time.perf_counter() - start
+
+    print(f"📊 {n} vectors, dim {DIM}, {n_queries} queries, recall@{k}")
+    print(f"   exact: {exact_single_qps:,.0f} q/s one by one, {exact_qps:,.0f} q/s batched")
+    print(f"   IVF: {ivf.n_lists} lists, built in {build_seconds:.1f}s\n")
+    print(f"{'n_probe':>7} {'recall':>7} {'q/s':>9} {'vs exact':>9}")
+    for n_probe in (1, 2, 4, 8, 16, 32, 64):
+        if n_probe > ivf.n_lists:
+            break
+        rate, (found, _) = qps(lambda: ivf.search_many(queries, k, n_probe), n_queries)
+        recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+        print(f"{n_probe:>7} {recall:>7.3f} {rate:>9,.0f} {rate / exact_single_qps:>8.1f}x")
+
+    with tempfile.TemporaryDirectory() as directory:
+        ivf.save(directory)
+        loaded = IVFIndex.load(directory)
+        same = all(np.array_equal(a, b) for a, b in zip(
+            ivf.search_many(queries[:20], k)[0], loaded.search_many(queries[:20], k)[0]))
+        print(f"\n💾 save/load round-trip: {'✅' if same else '❌'}")
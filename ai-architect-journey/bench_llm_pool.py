@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+from langchain_groq import ChatGroq
+from llm_pool import LLMPool
+import fake_groq
+import httpx
+import statistics
+import sys
+import time
+
+# ── BENCHMARK: PER-CALL CLIENT vs POOLED CLIENT ──────
+# Runs the same concurrent load against the local fake Groq server twice:
+# once building a new ChatGroq per call (the old get_llm) and once through a
+# shared LLMPool. Usage: python bench_llm_pool.py [requests] [concurrency]
+
+MODEL_NAME = "llama-3.3-70b-versatile"
+MESSAGES = [{"role": "user", "content": "What skills does an AI Architect need?"}]
+
+def run(label, get_llm, base_url, n_requests, concurrency):
+    httpx.post(f"{base_url}/stats/reset")
+
+    def one_call(_):
+        start = time.perf_counter()
+        get_llm().invoke(MESSAGES)
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(one_call, range(n_requests)))
+    elapsed = time.perf_counter() - start
+
+    stats = httpx.get(f"{base_url}/stats").json()
+    print(f"{label:<18} {n_requests / elapsed:>8.1f} req/s"
+          f"  mean {statistics.mean(latencies):>7.1f} ms"
+          f"  p95 {latencies[int(len(latencies) * 0.95) - 1]:>7.1f} ms"
+          f"  connections {stats['connections']:>4}")
+    return statistics.mean(latencies)
+
+if __name__ == "__main__":
+    n_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    server, base_url = fake_groq.start_in_thread()
+    print(f"🚀 Fake Groq at {base_url} "
+          f"({fake_groq.settings['latency_ms']:.0f} ms upstream latency)")
+    print(f"📊 {n_requests} requests, concurrency {concurrency}\n")
+
+    def per_call_llm():
+        return ChatGroq(api_key="fake", base_url=base_url, model_name=MODEL_NAME)
+
+    pool = LLMPool(api_key="fake", base_url=base_url, pool_size=concurrency)
+
+    # Warm both paths once so imports and the first connection are not timed
+    per_call_llm().invoke(MESSAGES)
+    pool.get(MODEL_NAME).invoke(MESSAGES)
+
+    per_call = run("per-call client", per_call_llm, base_url, n_requests, concurrency)
+    pooled = run("pooled client", lambda: pool.get(MODEL_NAME), base_url,
+                 n_requests, concurrency)
+
+    print(f"\n✅ Per-request overhead removed: {per_call - pooled:.1f} ms")
+    pool.http_client.close()
+    server.should_exit = True
@@ -0,0 +1,59 @@
+from quantized_index import QuantizedIndex
+from vector_index import VectorIndex, normalize
+import numpy as np
+import os
+import sys
+import tempfile
+import time
+
+# ── BENCHMARK: QUANTIZED STORAGE ─────────────────────
+# Resident memory, recall@k against float32 exact search, and query time
+# for float16 and int8 storage, with and without exact re-scoring. The
+# float32 matrix is memory-mapped from disk, as embedding_store.py leaves it,
+# so only the compact copy counts as resident.
+# Usage: python bench_quantized.py [vectors] [queries] [k]
+
+DIM = 384
+TOPICS = 2000
+SPREAD = 1.0
+
+def clustered_vectors(n, rng, centres):
+    topics = rng.integers(0, len(centres), n)
+    noise = rng.standard_normal((n, DIM), dtype=np.float32) * (SPREAD / np.sqrt(DIM))
+    return normalize(centres[topics] + noise)
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    k = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    rng = np.random.default_rng(0)
+    centres = normalize(rng.standard_normal((TOPICS, DIM), dtype=np.float32))
+    queries = clustered_vectors(n_queries, rng, centres)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "vectors.npy")
+        np.save(path, clustered_vectors(n, rng, centres))
+        full = np.load(path, mmap_mode="r")
+
+        exact = VectorIndex.from_normalized(np.asarray(full))
+        start = time.perf_counter()
+        exact.search_many(queries, k)
+        exact_ms = (time.perf_counter() - start) / n_queries * 1000
+        print(f"📊 {n} vectors, dim {DIM}, {n_queries} queries, recall@{k}\n")
+        print(f"{'mode':<8} {'rescore':>7} {'resident MB':>12} {'saved':>6} {'recall':>7} {'ms/q':>7}")
+        print(f"{'float32':<8} {'-':>7} {exact.vectors.nbytes / 1e6:>12.1f} {'-':>6} {1.0:>7.3f} {exact_ms:>7.2f}")
+        del exact
+
+        for mode in ("float16", "int8"):
+            index = QuantizedIndex(full, mode=mode, normalized=True)
+            stats = index.stats()
+            for rescore in (0, 2, 4):
+                start = time.perf_counter()
+                index.search_many(queries, k, rescore)
+                ms = (time.perf_counter() - start) / n_queries * 1000
+                recall = index.recall(queries, k, rescore)
+                saved = 1 - stats["resident_bytes"] / stats["float32_bytes"]
+                print(f"{mode:<8} {rescore:>7} {stats['resident_bytes'] / 1e6:>12.1f} "
+                      f"{saved:>6.0%} {recall:>7.3f} {ms:>7.2f}")
+            del index
+        del full
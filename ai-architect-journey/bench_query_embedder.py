@@ -0,0 +1,58 @@
+from query_embedder import QueryEmbedder
+import asyncio
+import numpy as np
+import sys
+import time
+
+# ── BENCHMARK: QUERY EMBEDDING MICRO-BATCHING ────────
+# Fires concurrent embed() calls at QueryEmbedder with batch size 1 (no
+# batching) and with micro-batching. The stand-in encoder costs a fixed
+# per-call overhead plus a small per-text cost, the shape of a
+# SentenceTransformer.encode call on CPU; pass --real to use the model.
+# Usage: python bench_query_embedder.py [requests] [concurrency] [--real]
+
+DIM = 384
+CALL_OVERHEAD = 0.008   # seconds per encode() call
+PER_TEXT = 0.0005       # seconds per text
+
+def fake_encode(texts):
+    time.sleep(CALL_OVERHEAD + PER_TEXT * len(texts))
+    return np.random.default_rng(len(texts)).standard_normal((len(texts), DIM))
+
+async def run(embedder, n_requests, concurrency, repeat_share=0.0):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        # repeat_share of the traffic asks an earlier question again
+        text = f"question {i % max(1, int(n_requests * (1 - repeat_share)))}"
+        async with semaphore:
+            start = time.perf_counter()
+            await embedder.embed(text)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(n_requests)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return n_requests / elapsed, latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99) - 1] * 1000
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    n_requests = int(args[0]) if args else 2000
+    concurrency = int(args[1]) if len(args) > 1 else 64
+    encode = fake_encode
+    if "--real" in sys.argv:
+        from semantic_cache import load_embedder
+        encode = load_embedder()
+
+    print(f"📊 {n_requests} queries, concurrency {concurrency}\n")
+    print(f"{'setup':<28} {'q/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'avg batch':>10}")
+    for label, batch, wait, repeats in (
+            ("batch 1, no cache", 1, 0, 0.0),
+            ("micro-batch 32 / 5 ms", 32, 5, 0.0),
+            ("micro-batch + 50% repeats", 32, 5, 0.5)):
+        embedder = QueryEmbedder(encode, max_batch_size=batch, max_wait_ms=wait)
+        rate, p50, p99 = asyncio.run(run(embedder, n_requests, concurrency, repeats))
+        stats = embedder.stats()
+        print(f"{label:<28} {rate:>8.0f} {p50:>8.1f} {p99:>8.1f} {stats['avg_batch_size']!s:>10}")
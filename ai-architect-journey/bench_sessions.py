@@ -0,0 +1,60 @@
+from multiprocessing import Process, Queue
+from session_store import SQLiteSessionStore
+import os
+import sys
+import tempfile
+import time
+
+# ── BENCHMARK: SQLITE SESSION APPENDS ACROSS PROCESSES
+# Each worker process opens the shared session DB and appends messages to
+# its own sessions, like uvicorn --workers with SESSION_BACKEND=sqlite.
+# Reports aggregate appends per second for 1..N processes.
+# Usage: python bench_sessions.py [appends_per_process] [max_processes]
+
+MESSAGE = {"role": "user", "content": "What skills does an AI Architect need? " * 4}
+
+def worker(path, worker_id, appends, sessions_per_worker, results):
+    store = SQLiteSessionStore("You are a tutor.", path=path, max_sessions=1_000_000,
+                               max_bytes=10**12)
+    session_ids = [f"w{worker_id}-s{i}" for i in range(sessions_per_worker)]
+    for session_id in session_ids:
+        store.get(session_id)
+    start = time.perf_counter()
+    for i in range(appends):
+        store.append(session_ids[i % sessions_per_worker], MESSAGE)
+    results.put(time.perf_counter() - start)
+    store.close()
+
+def run(processes, appends, sessions_per_worker=10):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessions.db")
+        SQLiteSessionStore("You are a tutor.", path=path).close()  # create schema once
+        results = Queue()
+        workers = [
+            Process(target=worker, args=(path, i, appends, sessions_per_worker, results))
+            for i in range(processes)
+        ]
+        start = time.perf_counter()
+        for p in workers:
+            p.start()
+        for p in workers:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        store = SQLiteSessionStore("You are a tutor.", path=path)
+        stored = store.db.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        store.close()
+
+    expected = processes * (appends + sessions_per_worker)
+    status = "✅" if stored == expected else f"❌ expected {expected}"
+    print(f"{processes:>2} processes  {processes * appends / elapsed:>9.0f} appends/s"
+          f"  ({stored} messages stored {status})")
+
+if __name__ == "__main__":
+    appends = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    max_processes = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    print(f"📊 {appends} appends per process\n")
+    processes = 1
+    while processes <= max_processes:
+        run(processes, appends)
+        processes *= 2
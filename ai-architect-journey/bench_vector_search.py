@@ -0,0 +1,58 @@
+from vector_index import VectorIndex
+import numpy as np
+import sys
+import time
+
+# ── BENCHMARK: VECTOR SEARCH ─────────────────────────
+# Old day9 semantic_search (norms recomputed + full argsort on every query)
+# against VectorIndex.search (pre-normalized + argpartition) and
+# VectorIndex.search_many (one matmul per batch of queries), on random
+# 384-dim vectors like all-MiniLM-L6-v2 produces.
+# Usage: python bench_vector_search.py [max_vectors] [queries]
+
+DIM = 384
+K = 3
+
+def old_search(doc_embeddings, query_embedding, n_results=K):
+    dot_products = np.dot(doc_embeddings, query_embedding.T).flatten()
+    norms = np.linalg.norm(doc_embeddings, axis=1) * np.linalg.norm(query_embedding)
+    similarities = dot_products / (norms + 1e-10)
+    return np.argsort(similarities)[::-1][:n_results]
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+def random_vectors(n, rng):
+    # Generated in blocks so 1M x 384 never needs a float64 copy
+    vectors = np.empty((n, DIM), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        block = min(100_000, n - start)
+        vectors[start:start + block] = rng.standard_normal((block, DIM), dtype=np.float32)
+    return vectors
+
+if __name__ == "__main__":
+    max_vectors = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((n_queries, DIM), dtype=np.float32)
+
+    print(f"📊 dim {DIM}, top-{K}, {n_queries} queries per batch\n")
+    print(f"{'vectors':>9} {'old ms/q':>10} {'search ms/q':>12} {'many ms/q':>10} {'speedup':>8}  same")
+    n = 10_000
+    while n <= max_vectors:
+        docs = random_vectors(n, rng)
+        index = VectorIndex(docs)
+        repeat = max(1, 200_000 // n)
+
+        old_ms, old_top = timed(lambda: old_search(docs, queries[:1]), repeat)
+        new_ms, (new_top, _) = timed(lambda: index.search(queries[0], K), repeat)
+        many_ms, _ = timed(lambda: index.search_many(queries, K), max(1, repeat // 4))
+        many_ms /= n_queries
+
+        same = "✅" if list(old_top) == list(new_top) else "❌"
+        print(f"{n:>9} {old_ms:>10.2f} {new_ms:>12.2f} {many_ms:>10.2f} {old_ms / many_ms:>7.1f}x  {same}")
+        del docs, index
+        n *= 10
@@ -0,0 +1,121 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from retrieval import ChunkIndex
+import json
+import os
+import re
+import threading
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, single worker only
+    fcntl = None
+
+# ── DOCUMENT COLLECTIONS ─────────────────────────────
+# Documents are chunked and indexed once when they are added to a
+# collection, and the index is saved as <directory>/<collection_id>.json.
+# /rag can then query a collection by id instead of re-uploading and
+# re-processing every document on every question. Recently used indexes
+# stay in memory; the rest are loaded from disk on demand.
+# With several uvicorn workers each process has its own in-memory copies, so
+# a cached index is only reused while its file is unchanged (same inode,
+# mtime and size; save() always writes a new file), and append/delete take
+# an flock on <directory>/.lock so one worker's append re-reads and keeps
+# the documents another worker just added.
+
+COLLECTION_ID = re.compile(r"[0-9a-f]{32}")
+
+def file_version(stat):
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+class CollectionStore:
+    def __init__(self, directory="collections", max_loaded=32):
+        self.directory = directory
+        self.max_loaded = max_loaded
+        self.loaded = OrderedDict()
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, collection_id):
+        return os.path.join(self.directory, f"{collection_id}.json")
+
+    def get(self, collection_id):
+        # Called from the threadpool; the LRU is shared with append/delete
+        with self.lock:
+            return self.load(collection_id)
+
+    def load(self, collection_id):
+        # Caller holds self.lock
+        if not COLLECTION_ID.fullmatch(collection_id):
+            return None
+        try:
+            with open(self.path(collection_id), encoding="utf-8") as f:
+                version = file_version(os.fstat(f.fileno()))
+                cached = self.loaded.get(collection_id)
+                if cached is not None and cached[0] == version:
+                    self.loaded.move_to_end(collection_id)
+                    return cached[1]
+                index = ChunkIndex.from_dict(json.load(f))
+        except FileNotFoundError:
+            self.loaded.pop(collection_id, None)  # deleted, maybe by another worker
+            return None
+        self.remember(collection_id, index, version)
+        return index
+
+    @contextmanager
+    def file_lock(self):
+        # Serializes writers across worker processes
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, ".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def create(self, documents):
+        collection_id = uuid.uuid4().hex
+        index = ChunkIndex(documents)
+        with self.lock:
+            self.remember(collection_id, index, self.save(collection_id, index))
+        return collection_id, index
+
+    def append(self, collection_id, documents):
+        with self.lock, self.file_lock():
+            # Re-read under the file lock: another worker may have appended
+            index = self.load(collection_id)
+            if index is None:
+                return None, 0
+            added = index.add_documents(documents)
+            self.remember(collection_id, index, self.save(collection_id, index))
+        return index, added
+
+    def delete(self, collection_id):
+        if not COLLECTION_ID.fullmatch(collection_id):
+            return False
+        with self.lock, self.file_lock():
+            self.loaded.pop(collection_id, None)
+            try:
+                os.remove(self.path(collection_id))
+            except FileNotFoundError:
+                return False
+        return True
+
+    def save(self, collection_id, index):
+        # Write then rename so a crash never leaves a half-written index
+        path = self.path(collection_id)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(index.to_dict(), f, ensure_ascii=False)
+            f.flush()
+            version = file_version(os.fstat(f.fileno()))
+        os.replace(path + ".tmp", path)
+        return version
+
+    def remember(self, collection_id, index, version):
+        self.loaded[collection_id] = (version, index)
+        self.loaded.move_to_end(collection_id)
+        while len(self.loaded) > self.max_loaded:
+            self.loaded.popitem(last=False)
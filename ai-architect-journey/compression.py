@@ -0,0 +1,135 @@
+from fastapi import Request, Response
+import gzip
+import hashlib
+import zlib
+
+# ── RESPONSE COMPRESSION ─────────────────────────────
+# GZipMiddleware compresses responses of at least minimum_size bytes when the
+# client sends Accept-Encoding: gzip. Streamed bodies are compressed chunk by
+# chunk with a sync flush, so each chunk still reaches the client when it is
+# sent. Server-sent events are left alone (proxies and EventSource handle
+# them better uncompressed), as is anything that already has a
+# Content-Encoding. Every response that could have been compressed carries
+# Vary: Accept-Encoding, sent plain or not, so caches keep the variants apart.
+#
+# PrecompressedPage is for fixed content like the landing page: it is
+# gzipped once, gets an ETag, and If-None-Match hits come back as 304.
+
+SKIP_TYPES = ("text/event-stream",)
+
+def accepts_gzip(accept_encoding):
+    # "gzip", "gzip;q=0.8" and "*" accept; "gzip;q=0" refuses
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip() not in ("gzip", "*"):
+            continue
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+def header(headers, name):
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+def with_vary(headers):
+    vary = header(headers, b"vary")
+    if vary is None:
+        return [*headers, (b"vary", b"Accept-Encoding")]
+    if any(v.strip().lower() in ("accept-encoding", "*") for v in vary.split(",")):
+        return headers
+    return [(k, v) for k, v in headers if k.lower() != b"vary"] + [
+        (b"vary", f"{vary}, Accept-Encoding".encode("latin-1"))]
+
+class GZipMiddleware:
+    def __init__(self, app, minimum_size=1024, compresslevel=6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept = header(scope["headers"], b"accept-encoding") or ""
+        use_gzip = scope["method"] != "HEAD" and accepts_gzip(accept)
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body chunk decides
+                start = message
+                headers = message["headers"]
+                content_type = header(headers, b"content-type") or ""
+                passthrough = (header(headers, b"content-encoding") is not None
+                               or content_type.startswith(SKIP_TYPES)
+                               or message["status"] in (204, 304))
+                if passthrough:
+                    await send(start)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not use_gzip or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    await send({**start, "headers": with_vary(start["headers"])})
+                    return await send(message)
+                # wbits=31: gzip container rather than raw zlib
+                compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, 31)
+                headers = [(k, v) for k, v in with_vary(start["headers"])
+                           if k.lower() not in (b"content-length", b"etag")]
+                headers.append((b"content-encoding", b"gzip"))
+                if not more_body:
+                    data = compressor.compress(body) + compressor.flush()
+                    headers.append((b"content-length", str(len(data)).encode()))
+                    await send({**start, "headers": headers})
+                    return await send({"type": "http.response.body", "body": data})
+                await send({**start, "headers": headers})
+
+            flush = zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH
+            data = compressor.compress(body) + compressor.flush(flush)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+class PrecompressedPage:
+    def __init__(self, content, media_type="text/html", max_age=300):
+        self.body = content.encode("utf-8")
+        # mtime=0 so the gzip bytes (and so the ETag) are the same every start
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(self.body).hexdigest()[:16]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gz"'
+        self.media_type = media_type
+        self.cache_control = f"public, max-age={max_age}"
+
+    def response(self, request: Request):
+        use_gzip = accepts_gzip(request.headers.get("accept-encoding", ""))
+        etag = self.gzip_etag if use_gzip else self.etag
+        headers = {
+            "ETag": etag,
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding"
+        }
+        if_none_match = request.headers.get("if-none-match", "")
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        # Only the negotiated variant's tag counts: a client that cannot take
+        # gzip must not be told to reuse a gzipped copy
+        if "*" in tags or etag in tags:
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(self.gzip_body, media_type=self.media_type, headers=headers)
+        return Response(self.body, media_type=self.media_type, headers=headers)
@@ -1,10 +1,15 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from pydantic import BaseModel
 from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from dotenv import load_dotenv
+from limiter import UpstreamLimiter, UpstreamBusy
+from session_store import SessionStore
+from profiling import Profiler, ProfilingMiddleware, profiling_routes
+from response_cache import ResponseCache, cache_key
+from resilience import Resilience, CircuitOpen, UpstreamTimeout
 import os
 import json
 import time
@@ -26,11 +31,58 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+# Opt-in cProfile of single requests or a sampled fraction (see profiling.py)
+profiler = Profiler(
+    token=os.getenv("PROFILE_TOKEN"),
+    sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+    directory=os.getenv("PROFILE_DIR", "profiles")
+)
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+app.include_router(profiling_routes(profiler))
+
+# Retries happen in resilience below, not inside the Groq SDK
 llm = ChatGroq(
     api_key=os.getenv("GROQ_API_KEY"),
-    model_name="llama-3.3-70b-versatile"
+    model_name="llama-3.3-70b-versatile",
+    max_retries=0
+)
+
+# Per-call deadline, retries with jitter, optional hedging, circuit breaker
+resilience = Resilience(
+    deadline=float(os.getenv("LLM_DEADLINE_SECONDS", "30")),
+    max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+    hedge=os.getenv("LLM_HEDGE", "0") == "1",
+    failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+    reset_seconds=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
 )
 
+# Cap on concurrent Groq calls; extra requests queue, then get 429
+limiter = UpstreamLimiter(
+    max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "10")),
+    max_queue=int(os.getenv("LLM_MAX_QUEUE", "50")),
+    queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT", "10"))
+)
+
+@app.exception_handler(UpstreamBusy)
+async def upstream_busy_handler(request, exc):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.exception_handler(CircuitOpen)
+async def circuit_open_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.exception_handler(UpstreamTimeout)
+async def upstream_timeout_handler(request, exc):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
 # ── DATA MODELS ──────────────────────────────────────
 class ChatRequest(BaseModel):
     message: str
@@ -51,17 +103,30 @@ class AgentRequest(BaseModel):
     tools: list[str] = ["calculator", "datetime"]
 
 # ── SESSION MEMORY ───────────────────────────────────
-sessions = {}
-
-def get_session(session_id: str):
-    if session_id not in sessions:
-        sessions[session_id] = [
-            {"role": "system", "content": """You are an elite AI Architect tutor.
+SYSTEM_PROMPT = """You are an elite AI Architect tutor.
 Your student is building towards ₹1CR+ salary.
 They have completed 10 days of projects.
-Be concise, practical, and encouraging."""}
-        ]
-    return sessions[session_id]
+Be concise, practical, and encouraging."""
+
+# Bounded: LRU past SESSION_MAX, idle TTL, and a total byte budget
+sessions = SessionStore(
+    system_prompt=SYSTEM_PROMPT,
+    max_sessions=int(os.getenv("SESSION_MAX", "1000")),
+    ttl_seconds=float(os.getenv("SESSION_TTL_SECONDS", "3600")),
+    max_bytes=int(os.getenv("SESSION_MAX_BYTES", "50000000"))
+)
+
+def get_session(session_id: str):
+    return sessions.get(session_id)
+
+# ── RESPONSE CACHE ───────────────────────────────────
+# Stateless prompts are cached by a hash of their inputs; set
+# RESPONSE_CACHE_DB to keep answers across restarts
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX", "1000")),
+    ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600")),
+    db_path=os.getenv("RESPONSE_CACHE_DB")
+)
 
 # ── ROUTES ───────────────────────────────────────────
 
@@ -99,7 +164,7 @@ async def root():
             <span class="method">POST</span> /agent — AI agent with tools
         </div>
         <div class="endpoint">
-            <span class="method">GET</span> /sessions — List active sessions
+            <span class="method">GET</span> /sessions — List active sessions (?cursor=&limit=&prefix=)
         </div>
         <br>
         <p>📚 Interactive docs: <a href="/docs">/docs</a></p>
@@ -115,6 +180,10 @@ async def health():
         "timestamp": datetime.now().isoformat(),
         "model": "llama-3.3-70b-versatile",
         "active_sessions": len(sessions),
+        "sessions": sessions.stats(),
+        "upstream": limiter.stats(),
+        "resilience": resilience.stats(),
+        "response_cache": response_cache.stats(),
         "version": "1.0.0"
     }
 
@@ -125,12 +194,13 @@ async def chat(request: ChatRequest):
     
     start = time.time()
     history = get_session(request.session_id)
-    history.append({"role": "user", "content": request.message})
+    sessions.append(request.session_id, {"role": "user", "content": request.message})
     
-    response = llm.invoke(history)
+    async with limiter.slot():
+        response = await resilience.call(lambda: llm.ainvoke(history))
     reply = response.content
     
-    history.append({"role": "assistant", "content": reply})
+    sessions.append(request.session_id, {"role": "assistant", "content": reply})
     
     return ChatResponse(
         reply=reply,
@@ -144,20 +214,30 @@ async def rag_endpoint(request: RAGRequest):
     if not request.documents:
         raise HTTPException(status_code=400, detail="No documents provided")
     
-    context = "\n".join([f"- {doc}" for doc in request.documents])
+    key = cache_key("rag", llm.model_name, request.question, request.documents)
+    answer = response_cache.get(key)
+    cached = answer is not None
+
+    if not cached:
+        context = "\n".join([f"- {doc}" for doc in request.documents])
     
-    template = ChatPromptTemplate.from_messages([
-        ("system", f"Answer based only on this context:\n{context}"),
-        ("human", "{question}")
-    ])
+        template = ChatPromptTemplate.from_messages([
+            ("system", f"Answer based only on this context:\n{context}"),
+            ("human", "{question}")
+        ])
     
-    chain = template | llm
-    response = chain.invoke({"question": request.question})
+        chain = template | llm
+        async with limiter.slot():
+            response = await resilience.call(lambda: chain.ainvoke({"question": request.question}))
     
+        answer = response.content
+        response_cache.set(key, answer)
+
     return {
         "question": request.question,
-        "answer": response.content,
+        "answer": answer,
         "sources_used": len(request.documents),
+        "cached": cached,
         "timestamp": datetime.now().isoformat()
     }
 
@@ -176,29 +256,43 @@ async def agent_endpoint(request: AgentRequest):
     
     tools_desc = "\n".join([f"- {k}: {v}" for k, v in requested_tools.items()])
     
-    template = ChatPromptTemplate.from_messages([
-        ("system", f"""You are an AI Agent with these tools:
+    key = cache_key("agent", llm.model_name, request.task, sorted(requested_tools))
+    result = response_cache.get(key)
+    cached = result is not None
+
+    if not cached:
+        template = ChatPromptTemplate.from_messages([
+            ("system", f"""You are an AI Agent with these tools:
 {tools_desc}
 Complete the task using available tools. Be specific and actionable."""),
-        ("human", "{task}")
-    ])
-    
-    chain = template | llm
-    response = chain.invoke({"task": request.task})
+            ("human", "{task}")
+        ])
+
+        chain = template | llm
+        async with limiter.slot():
+            response = await resilience.call(lambda: chain.ainvoke({"task": request.task}))
+        result = response.content
+        response_cache.set(key, result)
     
     return {
         "task": request.task,
-        "result": response.content,
+        "result": result,
         "tools_available": list(requested_tools.keys()),
+        "cached": cached,
         "timestamp": datetime.now().isoformat()
     }
 
 @app.get("/sessions")
-async def list_sessions():
+async def list_sessions(cursor: str | None = None, limit: int = 100, prefix: str = ""):
+    if not 1 <= limit <= 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    page, next_cursor = sessions.page(cursor=cursor, limit=limit, prefix=prefix)
     return {
         "active_sessions": len(sessions),
-        "session_ids": list(sessions.keys()),
-        "total_messages": sum(len(s) for s in sessions.values())
+        "session_ids": [entry["session_id"] for entry in page],
+        "total_messages": sessions.total_messages,
+        "sessions": page,
+        "next_cursor": next_cursor
     }
 
 @app.delete("/sessions/{session_id}")
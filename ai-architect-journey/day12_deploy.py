@@ -1,21 +1,191 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, PlainTextResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
 from dotenv import load_dotenv
+from contextlib import asynccontextmanager
+from importlib import import_module
+from limiter import UpstreamLimiter, UpstreamBusy
+from session_store import create_session_store, call_store
+from profiling import Profiler, ProfilingMiddleware, profiling_routes
+from response_cache import ResponseCache, cache_key
+from single_flight import SingleFlight
+from retrieval import ChunkIndex
+from collections_store import CollectionStore
+from history import HistoryManager
+from model_router import ModelRouter
+from resilience import Resilience, CircuitOpen, UpstreamTimeout
+from metrics import Registry, MetricsMiddleware
+from compression import GZipMiddleware, PrecompressedPage
+import asyncio
 import os
+import json
 import time
+import traceback
 from datetime import datetime
 
 load_dotenv()
 
+# ── LLM ─────────────────────────────────────────────
+GROQ_KEY = os.getenv("GROQ_API_KEY")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")  # e.g. a local fake_groq.py server
+MODEL_NAME = "llama-3.3-70b-versatile"
+# Short, simple prompts go to this model; set FAST_MODEL_NAME= to turn off
+FAST_MODEL_NAME = os.getenv("FAST_MODEL_NAME", "llama-3.1-8b-instant") or None
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "20"))
+LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", "30"))
+
+# Cap on concurrent Groq calls; extra requests queue, then get 429
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "10"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "50"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "10"))
+
+# Per-call deadline, retries, optional hedging and circuit breakers
+resilience = Resilience(
+    deadline=float(os.getenv("LLM_DEADLINE_SECONDS", "30")),
+    max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+    hedge=os.getenv("LLM_HEDGE", "0") == "1",
+    failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+    reset_seconds=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+)
+
+# ── METRICS ──────────────────────────────────────────
+registry = Registry()
+
+llm_pool = None
+limiter = UpstreamLimiter(
+    max_in_flight=LLM_MAX_IN_FLIGHT,
+    max_queue=LLM_MAX_QUEUE,
+    queue_timeout=LLM_QUEUE_TIMEOUT
+)
+
+def get_llm(model_name=MODEL_NAME):
+    global llm_pool
+    if llm_pool is None:
+        # langchain_groq is imported here rather than at module load so the
+        # server can start answering /health before it is ready for chat
+        from llm_pool import LLMPool
+        from llm_metrics import LLMMetricsHandler
+        llm_pool = LLMPool(
+            api_key=GROQ_KEY,
+            base_url=GROQ_BASE_URL,
+            pool_size=LLM_POOL_SIZE,
+            keepalive_seconds=LLM_KEEPALIVE_SECONDS,
+            callbacks=[LLMMetricsHandler(registry)],
+            max_retries=0
+        )
+    return llm_pool.get(model_name)
+
+# Chooses primary vs fast model per prompt and fails over between them
+router = ModelRouter(
+    get_llm,
+    primary=MODEL_NAME,
+    fast=FAST_MODEL_NAME,
+    fast_max_tokens=int(os.getenv("ROUTER_FAST_MAX_TOKENS", "40")),
+    fast_max_context=int(os.getenv("ROUTER_FAST_MAX_CONTEXT", "1500")),
+    max_error_rate=float(os.getenv("ROUTER_MAX_ERROR_RATE", "0.5")),
+    cooldown_seconds=float(os.getenv("ROUTER_COOLDOWN_SECONDS", "30")),
+    resilience=resilience
+)
+
+# ── STARTUP ──────────────────────────────────────────
+# uvicorn only starts serving once lifespan startup returns, so the slow
+# parts (LangChain imports, first upstream connection, embedding model) run
+# in a background warm-up instead. /health answers straight away; /ready
+# returns 503 until the warm-up is done, so the platform can hold traffic.
+# A failed warm-up is retried WARM_UP_ATTEMPTS times with backoff; after that
+# the error is logged and shown on /ready and /health instead of leaving the
+# process silently unready.
+WARM_UP_ATTEMPTS = int(os.getenv("WARM_UP_ATTEMPTS", "3"))
+
+ready = False
+startup_seconds = None
+warm_up_error = None
+warm_up_task = None
+
+async def warm_up():
+    global ready, startup_seconds, warm_up_error
+    start = time.time()
+    for attempt in range(1, WARM_UP_ATTEMPTS + 1):
+        try:
+            await warm_up_once()
+            break
+        except Exception as e:
+            warm_up_error = f"{type(e).__name__}: {e}"
+            print(f"❌ Warm-up attempt {attempt}/{WARM_UP_ATTEMPTS} failed: {warm_up_error}")
+            traceback.print_exc()
+            if attempt == WARM_UP_ATTEMPTS:
+                return
+            await asyncio.sleep(2 ** attempt)
+    warm_up_error = None
+    startup_seconds = round(time.time() - start, 3)
+    ready = True
+
+def warm_up_done(task):
+    # Last line of defence: anything that escaped warm_up() still gets logged
+    global warm_up_error
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        warm_up_error = f"{type(error).__name__}: {error}"
+        print(f"❌ Warm-up crashed: {warm_up_error}")
+
+async def warm_up_once():
+    global semantic_cache, query_embedder
+    for module in ("llm_pool", "llm_metrics"):
+        await run_in_threadpool(import_module, module)
+    for model_name in router.health:
+        get_llm(model_name)
+
+    # Open a keep-alive connection (DNS + TCP + TLS) to Groq before the
+    # first user request needs one
+    upstream = GROQ_BASE_URL or "https://api.groq.com"
+    try:
+        await llm_pool.http_async_client.get(
+            f"{upstream}/openai/v1/models",
+            headers={"Authorization": f"Bearer {GROQ_KEY}"}
+        )
+    except Exception as e:
+        print(f"⚠️ Could not prewarm the Groq connection: {e}")
+
+    if SEMANTIC_CACHE_ENABLED:
+        # Needs sentence-transformers + numpy (see day9_vectorrag.py)
+        from semantic_cache import SemanticCache, load_embedder
+        from query_embedder import QueryEmbedder
+        embed = await run_in_threadpool(load_embedder)
+        query_embedder = QueryEmbedder(
+            embed,
+            max_entries=int(os.getenv("QUERY_EMBED_CACHE_MAX", "10000")),
+            max_batch_size=int(os.getenv("QUERY_EMBED_BATCH", "32")),
+            max_wait_ms=float(os.getenv("QUERY_EMBED_WAIT_MS", "5"))
+        )
+        semantic_cache = SemanticCache(
+            max_entries=int(os.getenv("SEMANTIC_CACHE_MAX", "1000")),
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+        )
+
+@asynccontextmanager
+async def lifespan(app):
+    global llm_pool, warm_up_task
+    warm_up_task = asyncio.create_task(warm_up())
+    warm_up_task.add_done_callback(warm_up_done)
+    yield
+    warm_up_task.cancel()
+    if llm_pool is not None:
+        await llm_pool.aclose()
+        llm_pool = None
+    response_cache.close()
+    sessions.close()
+
 # ── APP ──────────────────────────────────────────────
 app = FastAPI(
     title="AI Architect API",
     description="Cloud-deployed AI API — Day 12",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -24,16 +194,39 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"]
 )
+# Large JSON (/rag, batches, session pages) goes out gzipped to clients that accept it
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_BYTES", "1024")))
+app.add_middleware(MetricsMiddleware, registry=registry)
 
-# ── LLM ─────────────────────────────────────────────
-GROQ_KEY = os.getenv("GROQ_API_KEY")
+# Opt-in cProfile of single requests or a sampled fraction (see profiling.py)
+profiler = Profiler(
+    token=os.getenv("PROFILE_TOKEN"),
+    sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+    directory=os.getenv("PROFILE_DIR", "profiles")
+)
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+app.include_router(profiling_routes(profiler))
 
-def get_llm():
-    return ChatGroq(
-        api_key=GROQ_KEY,
-        model_name="llama-3.3-70b-versatile"
+@app.exception_handler(UpstreamBusy)
+async def upstream_busy_handler(request, exc):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
     )
 
+@app.exception_handler(CircuitOpen)
+async def circuit_open_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.exception_handler(UpstreamTimeout)
+async def upstream_timeout_handler(request, exc):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
 # ── MODELS ──────────────────────────────────────────
 class ChatRequest(BaseModel):
     message: str
@@ -41,30 +234,85 @@ class ChatRequest(BaseModel):
 
 class RAGRequest(BaseModel):
     question: str
+    documents: list[str] = []
+    collection_id: str | None = None
+
+class CollectionRequest(BaseModel):
     documents: list[str]
 
-# ── MEMORY ──────────────────────────────────────────
-sessions = {}
+class ChatBatchRequest(BaseModel):
+    items: list[ChatRequest]
 
-def get_session(session_id: str):
-    if session_id not in sessions:
-        sessions[session_id] = [
-            {"role": "system", "content": """You are an elite AI Architect tutor.
+class RAGBatchRequest(BaseModel):
+    items: list[RAGRequest]
+
+# ── MEMORY ──────────────────────────────────────────
+SYSTEM_PROMPT = """You are an elite AI Architect tutor.
 Your student has completed 12 days of building AI projects:
 Day 1: Groq API Script | Day 2: Memory Chatbot | Day 3: Persistent Tutor
 Day 4: RAG System | Day 5: AI Agent | Day 6: Multi-Agent Pipeline  
 Day 7: Web App | Day 8: LangChain | Day 9: Vector DB | Day 10: Fine-tuning
 Day 11: FastAPI Backend | Day 12: Cloud Deployment (current)
 Goal: AI Architect role earning 1CR+ salary.
-Be concise, practical, and encouraging."""}
-        ]
-    return sessions[session_id]
+Be concise, practical, and encouraging."""
+
+# Bounded: LRU past SESSION_MAX, idle TTL, and a total byte budget.
+# SESSION_BACKEND=sqlite shares sessions between uvicorn --workers processes
+sessions = create_session_store(
+    os.getenv("SESSION_BACKEND", "memory"),
+    system_prompt=SYSTEM_PROMPT,
+    path=os.getenv("SESSION_DB", "sessions.db"),
+    max_sessions=int(os.getenv("SESSION_MAX", "1000")),
+    ttl_seconds=float(os.getenv("SESSION_TTL_SECONDS", "3600")),
+    max_bytes=int(os.getenv("SESSION_MAX_BYTES", "50000000"))
+)
+
+async def get_session(session_id: str):
+    # SQLite calls run in a thread (call_store) so a busy write lock held by
+    # another worker never stalls the event loop
+    return await call_store(sessions.get, session_id)
+
+# Prompt = system + running summary + newest turns within HISTORY_MAX_TOKENS
+history_manager = HistoryManager(
+    sessions,
+    get_llm,
+    limiter=limiter,
+    router=router,
+    max_tokens=int(os.getenv("HISTORY_MAX_TOKENS", "3000")),
+    # After a summary the window drops to this share of the budget
+    low_water=float(os.getenv("HISTORY_LOW_WATER", "0.5"))
+)
+
+# ── RESPONSE CACHE ───────────────────────────────────
+# Stateless prompts are cached by a hash of their inputs; set
+# RESPONSE_CACHE_DB to keep answers across restarts
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX", "1000")),
+    ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600")),
+    db_path=os.getenv("RESPONSE_CACHE_DB")
+)
+single_flight = SingleFlight()
+
+registry.gauge("upstream_in_flight", "LLM calls holding a limiter slot",
+               read=lambda: limiter.in_flight)
+registry.gauge("upstream_queue_depth", "Requests waiting for a limiter slot",
+               read=lambda: limiter.queued)
+registry.gauge("sessions_active", "Sessions in the session store",
+               read=lambda: len(sessions))
+registry.gauge("sessions_bytes", "Message bytes held by the session store",
+               read=lambda: sessions.total_bytes)
+
+# First-turn questions can be answered from a similar past question;
+# off by default because it loads an embedding model at startup
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE", "0") == "1"
+semantic_cache = None
+# Caches question embeddings and batches concurrent encodes (query_embedder.py)
+query_embedder = None
 
 # ── ROUTES ───────────────────────────────────────────
 
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    return """
+# Built once: gzipped at import, served with an ETag so repeat visits get 304
+LANDING_PAGE = PrecompressedPage("""
     <!DOCTYPE html>
     <html>
     <head>
@@ -124,20 +372,45 @@ async def root():
                 <span class="path">/health</span>
                 <span class="desc">Status check</span>
             </div>
+            <div class="endpoint">
+                <span class="method">GET</span>
+                <span class="path">/ready</span>
+                <span class="desc">Warm and ready</span>
+            </div>
             <div class="endpoint">
                 <span class="method">POST</span>
                 <span class="path">/chat</span>
                 <span class="desc">AI chat with memory</span>
             </div>
+            <div class="endpoint">
+                <span class="method">POST</span>
+                <span class="path">/chat/stream</span>
+                <span class="desc">Streaming chat (SSE)</span>
+            </div>
             <div class="endpoint">
                 <span class="method">POST</span>
                 <span class="path">/rag</span>
                 <span class="desc">Document Q&A</span>
             </div>
+            <div class="endpoint">
+                <span class="method">POST</span>
+                <span class="path">/chat/batch, /rag/batch</span>
+                <span class="desc">Many items per call</span>
+            </div>
+            <div class="endpoint">
+                <span class="method">POST</span>
+                <span class="path">/collections</span>
+                <span class="desc">Saved document sets</span>
+            </div>
             <div class="endpoint">
                 <span class="method">GET</span>
                 <span class="path">/sessions</span>
-                <span class="desc">Active sessions</span>
+                <span class="desc">Active sessions (?cursor=&limit=&prefix=)</span>
+            </div>
+            <div class="endpoint">
+                <span class="method">GET</span>
+                <span class="path">/sessions/export</span>
+                <span class="desc">NDJSON dump for operators</span>
             </div>
             
             <div class="links">
@@ -152,7 +425,11 @@ async def root():
         </div>
     </body>
     </html>
-    """
+""", max_age=int(os.getenv("LANDING_MAX_AGE", "300")))
+
+@app.get("/", response_class=HTMLResponse)
+async def root(request: Request):
+    return LANDING_PAGE.response(request)
 
 @app.get("/health")
 async def health():
@@ -160,58 +437,362 @@ async def health():
         "status": "healthy",
         "message": "AI Architect API is live!",
         "timestamp": datetime.now().isoformat(),
-        "model": "llama-3.3-70b-versatile",
+        "model": MODEL_NAME,
+        "router": router.stats(),
+        "resilience": resilience.stats(),
         "active_sessions": len(sessions),
+        "sessions": sessions.stats(),
+        "upstream": limiter.stats(),
+        "response_cache": response_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "history": history_manager.stats(),
+        "semantic_cache": semantic_cache.stats() if semantic_cache else None,
+        "query_embedder": query_embedder.stats() if query_embedder else None,
+        "warm_up": {"ready": ready, "seconds": startup_seconds, "error": warm_up_error},
         "version": "2.0.0",
         "deployed": "cloud"
     }
 
+@app.get("/ready")
+async def ready_check():
+    if not ready:
+        return JSONResponse(
+            status_code=503,
+            content={"ready": False, "error": warm_up_error},
+            headers={"Retry-After": "1"}
+        )
+    return {"ready": True, "warm_up_seconds": startup_seconds}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.post("/chat")
 async def chat(request: ChatRequest):
+    return await run_chat(request)
+
+async def run_chat(request: ChatRequest):
     if not request.message.strip():
         raise HTTPException(status_code=400, detail="Message cannot be empty")
     
-    history = get_session(request.session_id)
-    history.append({"role": "user", "content": request.message})
+    history = await get_session(request.session_id)
+    first_turn = len(history) == 1
+    await call_store(sessions.append, request.session_id, {"role": "user", "content": request.message})
+
+    vector = None
+    if semantic_cache is not None and first_turn:
+        vector = await query_embedder.embed(request.message)
+        entry, similarity = semantic_cache.lookup(vector)
+        if entry is not None:
+            reply, model = entry
+            await call_store(sessions.append, request.session_id, {"role": "assistant", "content": reply})
+            return {
+                "reply": reply,
+                "session_id": request.session_id,
+                "model": model,
+                "cached": True,
+                "similarity": round(similarity, 4),
+                "timestamp": datetime.now().isoformat()
+            }
     
-    llm = get_llm()
-    response = llm.invoke(history)
+    messages = history_manager.window(request.session_id, history)
+    async with limiter.slot():
+        response, model = await router.ainvoke(messages)
     reply = response.content
     
-    history.append({"role": "assistant", "content": reply})
+    await call_store(sessions.append, request.session_id, {"role": "assistant", "content": reply})
+    if vector is not None:
+        semantic_cache.add(vector, (reply, model))
     
     return {
         "reply": reply,
         "session_id": request.session_id,
+        "model": model,
+        "cached": False,
         "timestamp": datetime.now().isoformat()
     }
 
+def sse(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    if not request.message.strip():
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+
+    history = await get_session(request.session_id)
+    await call_store(sessions.append, request.session_id, {"role": "user", "content": request.message})
+    messages = history_manager.window(request.session_id, history)
+
+    # Take the upstream slot before streaming starts so a full server can
+    # still answer 429; the background task frees it even on disconnect
+    await limiter.acquire()
+
+    async def events():
+        start = time.time()
+        first_token_ms = None
+        parts = []
+        usage = None
+        model = None
+        try:
+            async for model, chunk in router.astream(messages):
+                if chunk.usage_metadata:
+                    usage = chunk.usage_metadata
+                if chunk.content:
+                    if first_token_ms is None:
+                        first_token_ms = round((time.time() - start) * 1000)
+                    parts.append(chunk.content)
+                    yield sse({"token": chunk.content})
+        except Exception as e:
+            yield sse({"detail": str(e)}, event="error")
+            return
+
+        reply = "".join(parts)
+        await call_store(sessions.append, request.session_id, {"role": "assistant", "content": reply})
+
+        yield sse({
+            "session_id": request.session_id,
+            "model": model,
+            "first_token_ms": first_token_ms,
+            "total_ms": round((time.time() - start) * 1000),
+            "prompt_tokens": usage["input_tokens"] if usage else None,
+            "completion_tokens": usage["output_tokens"] if usage else len(parts),
+            "timestamp": datetime.now().isoformat()
+        }, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(limiter.release)
+    )
+
+# Only the best-matching chunks of the uploaded documents go in the prompt
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "5"))
+RAG_CONTEXT_TOKENS = int(os.getenv("RAG_CONTEXT_TOKENS", "1500"))
+
+# Prebuilt, saved indexes so /rag can query by collection_id
+collections = CollectionStore(os.getenv("COLLECTIONS_DIR", "collections"))
+
+def rag_messages(question, chunks):
+    context = "\n".join([f"- {text}" for _, text in chunks])
+
+    # Plain messages rather than a ChatPromptTemplate: no template parsing
+    # per call, and braces inside documents are not mistaken for variables
+    return [
+        ("system", f"Answer based only on this context:\n{context}"),
+        ("human", question)
+    ]
+
+async def answer_rag(key, messages, intended):
+    async with limiter.slot():
+        response, model = await router.ainvoke(messages)
+
+    # A failover answer from the other model is not cached: it would be
+    # served for the whole TTL in place of the intended model's answer.
+    # The primary model's answer is always good enough to keep.
+    if model in (intended, MODEL_NAME):
+        response_cache.set(key, json.dumps({"answer": response.content, "model": model}))
+    return response.content, model
+
 @app.post("/rag")
 async def rag_endpoint(request: RAGRequest):
-    if not request.documents:
+    return await run_rag(request)
+
+async def run_rag(request: RAGRequest):
+    if request.collection_id:
+        index = await run_in_threadpool(collections.get, request.collection_id)
+        if index is None:
+            raise HTTPException(status_code=404, detail="Collection not found")
+    elif request.documents:
+        index = ChunkIndex(request.documents)
+    else:
         raise HTTPException(status_code=400, detail="No documents provided")
     
-    context = "\n".join([f"- {doc}" for doc in request.documents])
-    
-    template = ChatPromptTemplate.from_messages([
-        ("system", f"Answer based only on this context:\n{context}"),
-        ("human", "{question}")
-    ])
-    
-    llm = get_llm()
-    chain = template | llm
-    response = chain.invoke({"question": request.question})
-    
+    chunks = index.search(request.question, top_k=RAG_TOP_K, max_tokens=RAG_CONTEXT_TOKENS)
+
+    # The prompt depends only on the question and the selected chunks; the
+    # key includes the model the prompt is routed to, and the entry records
+    # which model actually answered
+    messages = rag_messages(request.question, chunks)
+    intended = router.intended(messages)
+    key = cache_key("rag-answer", intended, request.question, [text for _, text in chunks])
+    entry = response_cache.get(key)
+    cached = entry is not None
+
+    if cached:
+        entry = json.loads(entry)
+        answer, model = entry["answer"], entry["model"]
+    else:
+        # Identical requests already in flight share one upstream call
+        answer, model = await single_flight.do(
+            key, lambda: answer_rag(key, messages, intended)
+        )
+
+    chunk_ids = [chunk_id for chunk_id, _ in chunks]
     return {
         "question": request.question,
-        "answer": response.content,
-        "sources_used": len(request.documents),
+        "answer": answer,
+        "sources_used": len({chunk_id.split(":")[0] for chunk_id in chunk_ids}),
+        "chunks_used": chunk_ids,
+        "model": model,
+        "cached": cached,
+        "timestamp": datetime.now().isoformat()
+    }
+
+# ── BATCH ────────────────────────────────────────────
+# Items run concurrently (up to BATCH_MAX_CONCURRENCY) via Runnable.abatch;
+# results come back in request order and a failed item reports its own
+# error instead of failing the batch
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "100"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "5"))
+
+def batch_error(exc):
+    if isinstance(exc, HTTPException):
+        return {"error": exc.detail, "status_code": exc.status_code}
+    if isinstance(exc, UpstreamBusy):
+        return {"error": str(exc), "status_code": 429}
+    if isinstance(exc, CircuitOpen):
+        return {"error": str(exc), "status_code": 503}
+    if isinstance(exc, UpstreamTimeout):
+        return {"error": str(exc), "status_code": 504}
+    return {"error": str(exc), "status_code": 502}
+
+def check_batch(items):
+    # Counts request items, not the units run_batch fans out over (chat
+    # batches are grouped by session first)
+    if not items:
+        raise HTTPException(status_code=400, detail="No items provided")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BATCH_MAX_ITEMS} items per batch"
+        )
+
+async def run_batch(fn, items):
+    from langchain_core.runnables import RunnableLambda
+    return await RunnableLambda(fn).abatch(
+        items,
+        config={"max_concurrency": BATCH_MAX_CONCURRENCY},
+        return_exceptions=True
+    )
+
+def batch_response(outputs):
+    failed = sum(isinstance(o, Exception) for o in outputs)
+    return {
+        "results": [batch_error(o) if isinstance(o, Exception) else o for o in outputs],
+        "succeeded": len(outputs) - failed,
+        "failed": failed,
         "timestamp": datetime.now().isoformat()
     }
 
+@app.post("/chat/batch")
+async def chat_batch(request: ChatBatchRequest):
+    # Turns for the same session run one after another, in order, so they
+    # build on each other's history; different sessions run in parallel
+    check_batch(request.items)
+    groups = {}
+    for position, item in enumerate(request.items):
+        groups.setdefault(item.session_id, []).append(position)
+
+    async def run_group(positions):
+        outputs = []
+        for position in positions:
+            try:
+                outputs.append(await run_chat(request.items[position]))
+            except Exception as e:
+                outputs.append(e)
+        return outputs
+
+    group_outputs = await run_batch(run_group, list(groups.values()))
+    outputs = [None] * len(request.items)
+    for positions, results in zip(groups.values(), group_outputs):
+        for position, result in zip(positions, results):
+            outputs[position] = result
+    return batch_response(outputs)
+
+@app.post("/rag/batch")
+async def rag_batch(request: RAGBatchRequest):
+    check_batch(request.items)
+    return batch_response(await run_batch(run_rag, request.items))
+
+@app.post("/collections")
+async def create_collection(request: CollectionRequest):
+    if not request.documents:
+        raise HTTPException(status_code=400, detail="No documents provided")
+    collection_id, index = await run_in_threadpool(collections.create, request.documents)
+    return {
+        "collection_id": collection_id,
+        "documents": index.documents,
+        "chunks": len(index.chunks)
+    }
+
+@app.post("/collections/{collection_id}/documents")
+async def add_to_collection(collection_id: str, request: CollectionRequest):
+    if not request.documents:
+        raise HTTPException(status_code=400, detail="No documents provided")
+    index, added = await run_in_threadpool(collections.append, collection_id, request.documents)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    return {
+        "collection_id": collection_id,
+        "documents": index.documents,
+        "chunks": len(index.chunks),
+        "chunks_added": added
+    }
+
+@app.get("/collections/{collection_id}")
+async def get_collection(collection_id: str):
+    index = await run_in_threadpool(collections.get, collection_id)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    return {
+        "collection_id": collection_id,
+        "documents": index.documents,
+        "chunks": len(index.chunks)
+    }
+
+@app.delete("/collections/{collection_id}")
+async def delete_collection(collection_id: str):
+    if not await run_in_threadpool(collections.delete, collection_id):
+        raise HTTPException(status_code=404, detail="Collection not found")
+    return {"message": f"Collection {collection_id} deleted"}
+
+# ── SESSIONS ─────────────────────────────────────────
+# Cursor pagination: pass next_cursor back as ?cursor= to get the next page.
+# Counts come from the store's per-session totals, nothing is re-summed.
+SESSIONS_PAGE_MAX = int(os.getenv("SESSIONS_PAGE_MAX", "1000"))
+SESSIONS_EXPORT_PAGE = 200
+
+def check_page_limit(limit):
+    if not 1 <= limit <= SESSIONS_PAGE_MAX:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {SESSIONS_PAGE_MAX}")
+
 @app.get("/sessions")
-async def list_sessions():
+async def list_sessions(cursor: str | None = None, limit: int = 100, prefix: str = ""):
+    check_page_limit(limit)
+    page, next_cursor = sessions.page(cursor=cursor, limit=limit, prefix=prefix)
     return {
         "active_sessions": len(sessions),
-        "session_ids": list(sessions.keys())
-    }
\ No newline at end of file
+        "session_ids": [entry["session_id"] for entry in page],
+        "sessions": page,
+        "next_cursor": next_cursor
+    }
+
+@app.get("/sessions/export")
+async def export_sessions(prefix: str = "", messages: bool = False):
+    # One JSON object per line, fetched a page at a time so the export never
+    # holds every session in memory
+    async def lines():
+        cursor = None
+        while True:
+            page, cursor = sessions.page(cursor=cursor, limit=SESSIONS_EXPORT_PAGE,
+                                         prefix=prefix, include_messages=messages)
+            for entry in page:
+                yield json.dumps(entry) + "\n"
+            if cursor is None:
+                break
+            await asyncio.sleep(0)  # let requests run between pages
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
\ No newline at end of file
@@ -2,7 +2,11 @@ from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
-import numpy as np
+from vector_index import VectorIndex
+from embedding_store import EmbeddingStore
+from ivf_index import IVFIndex
+from quantized_index import QuantizedIndex
+from query_embedder import QueryEmbedder
 import os
 
 load_dotenv()
@@ -38,23 +42,47 @@ print("\n📦 Loading embedding model...")
 
 embedder = SentenceTransformer("all-MiniLM-L6-v2")
 
+# Saved under DAY9_INDEX_DIR; only new or edited documents are re-encoded,
+# the rest are memory-mapped from disk
 print("🔢 Creating vector embeddings...")
-doc_embeddings = embedder.encode(documents, convert_to_numpy=True)
+store = EmbeddingStore(os.getenv("DAY9_INDEX_DIR", "day9_index"))
+doc_embeddings = store.sync(
+    documents,
+    lambda texts: embedder.encode(texts, convert_to_numpy=True),
+    model_name="all-MiniLM-L6-v2"
+)
+print(f"   {store.encoded} encoded, {store.reused} reused from disk")
+# Already normalized, so each search is a single dot product per document.
+# DAY9_INDEX=ivf swaps in approximate search for large corpora;
+# float16 / int8 keep a compact copy in RAM and re-score from the mapped file
+INDEX_MODE = os.getenv("DAY9_INDEX", "exact")
+if INDEX_MODE == "ivf":
+    index = IVFIndex(n_probe=int(os.getenv("DAY9_IVF_PROBE", "8"))).build(doc_embeddings)
+elif INDEX_MODE in ("float16", "int8"):
+    index = QuantizedIndex(doc_embeddings, mode=INDEX_MODE, normalized=True)
+    print(f"   {index.stats()['resident_bytes']} bytes resident ({INDEX_MODE})")
+else:
+    index = VectorIndex.from_normalized(doc_embeddings)
 
 print(f"✅ {len(documents)} documents stored as vectors!\n")
 
+# Repeated questions reuse their embedding instead of re-encoding
+query_embedder = QueryEmbedder(lambda texts: embedder.encode(texts, convert_to_numpy=True))
+
 # ── 3. SEMANTIC SEARCH FUNCTION ──────────────────────
 def semantic_search(query, n_results=3):
-    query_embedding = embedder.encode([query], convert_to_numpy=True)
+    query_embedding = query_embedder.embed_sync(query)
 
-    # Cosine similarity
-    dot_products = np.dot(doc_embeddings, query_embedding.T).flatten()
-    norms = np.linalg.norm(doc_embeddings, axis=1) * np.linalg.norm(query_embedding)
-    similarities = dot_products / (norms + 1e-10)
-
-    top_indices = np.argsort(similarities)[::-1][:n_results]
+    # Cosine similarity + partial sort for the top n_results
+    top_indices, _ = index.search(query_embedding, n_results)
     return [documents[i] for i in top_indices]
 
+def semantic_search_many(queries, n_results=3):
+    # One encode call (for the uncached ones) and one matrix multiply
+    query_embeddings = query_embedder.embed_many_sync(queries)
+    top_indices, _ = index.search_many(query_embeddings, n_results)
+    return [[documents[i] for i in row] for row in top_indices]
+
 # ── 4. ADVANCED RAG FUNCTION ─────────────────────────
 def advanced_rag(question):
     relevant_docs = semantic_search(question)
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import numpy as np
+import os
+
+# ── PERSISTENT EMBEDDINGS ────────────────────────────
+# Saves the normalized document matrix for day9_vectorrag.py as
+# <directory>/vectors.npy next to manifest.json, which records the embedding
+# model and a SHA-256 per document (in row order). On startup sync() hashes
+# the current documents, re-encodes only the ones whose hash is not in the
+# manifest, copies the rest across, and returns the matrix memory-mapped,
+# so it is paged in by the OS on demand instead of read into RAM.
+# If nothing changed, nothing is encoded or written.
+
+COPY_BLOCK = 10_000  # rows copied at a time when rebuilding
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EmbeddingStore:
+    def __init__(self, directory="day9_index"):
+        self.directory = directory
+        self.vectors_path = os.path.join(directory, "vectors.npy")
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self.encoded = 0
+        self.reused = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            vectors = np.load(self.vectors_path, mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            return None, None
+        if len(vectors) != len(manifest["hashes"]):
+            return None, None  # torn write from an older version; rebuild
+        return manifest, vectors
+
+    def sync(self, documents, encode, model_name):
+        # encode(list_of_texts) -> (n, dim) array, e.g. SentenceTransformer.encode
+        hashes = [content_hash(doc) for doc in documents]
+        manifest, old = self.load_manifest()
+        if manifest is None or manifest["model"] != model_name:
+            manifest, old = {"model": model_name, "hashes": []}, None
+
+        if manifest["hashes"] == hashes:
+            self.reused = len(hashes)
+            self.encoded = 0
+            return old
+
+        old_rows = {h: row for row, h in enumerate(manifest["hashes"])}
+        missing = [i for i, h in enumerate(hashes) if h not in old_rows]
+        new_vectors = None
+        if missing:
+            new_vectors = np.asarray(encode([documents[i] for i in missing]), dtype=np.float32)
+            new_vectors /= np.linalg.norm(new_vectors, axis=1, keepdims=True) + 1e-10
+        dim = new_vectors.shape[1] if new_vectors is not None else old.shape[1]
+
+        # Build the new matrix in a temp file, then swap it in
+        tmp_path = self.vectors_path + ".tmp.npy"
+        out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32,
+                                        shape=(len(documents), dim))
+        kept = [(i, old_rows[h]) for i, h in enumerate(hashes) if h in old_rows]
+        for start in range(0, len(kept), COPY_BLOCK):
+            block = kept[start:start + COPY_BLOCK]
+            out[[i for i, _ in block]] = old[[row for _, row in block]]
+        if missing:
+            out[missing] = new_vectors
+        out.flush()
+        del out, old
+
+        os.replace(tmp_path, self.vectors_path)
+        with open(self.manifest_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"model": model_name, "dim": dim, "hashes": hashes}, f)
+        os.replace(self.manifest_path + ".tmp", self.manifest_path)
+
+        self.encoded = len(missing)
+        self.reused = len(kept)
+        return np.load(self.vectors_path, mmap_mode="r")
@@ -0,0 +1,171 @@
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
+import json
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+import uvicorn
+
+# ── FAKE GROQ ────────────────────────────────────────
+# A local stand-in for the Groq (OpenAI-compatible) chat completions API so
+# benchmarks and load tests can run without spending real quota. Point
+# ChatGroq at it with base_url, or run the API with
+# GROQ_BASE_URL=http://127.0.0.1:9000
+#
+#   uvicorn fake_groq:app --port 9000
+#
+# Behaviour is set with FAKE_GROQ_* environment variables (or configure()):
+#   LATENCY_MS         mean time before the first byte
+#   LATENCY_DIST       fixed | uniform | exponential | lognormal
+#   LATENCY_SPREAD     +/- range for uniform, sigma for lognormal
+#   TOKENS_PER_SECOND  streaming speed
+#   REPLY_WORDS        length of every reply
+#   ERROR_RATE         fraction of calls answered with 429/500/503
+
+settings = {
+    "latency_ms": float(os.getenv("FAKE_GROQ_LATENCY_MS", "50")),
+    "latency_dist": os.getenv("FAKE_GROQ_LATENCY_DIST", "fixed"),
+    "latency_spread": float(os.getenv("FAKE_GROQ_LATENCY_SPREAD", "0.5")),
+    "tokens_per_second": float(os.getenv("FAKE_GROQ_TOKENS_PER_SECOND", "200")),
+    "reply_words": int(os.getenv("FAKE_GROQ_REPLY_WORDS", "10")),
+    "error_rate": float(os.getenv("FAKE_GROQ_ERROR_RATE", "0")),
+}
+ERROR_STATUSES = (429, 500, 503)
+
+def configure(**overrides):
+    unknown = set(overrides) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown fake Groq settings: {sorted(unknown)}")
+    settings.update(overrides)
+
+def sample_latency():
+    mean = settings["latency_ms"] / 1000
+    dist = settings["latency_dist"]
+    spread = settings["latency_spread"]
+    if dist == "uniform":
+        return max(0.0, random.uniform(mean * (1 - spread), mean * (1 + spread)))
+    if dist == "exponential":
+        return random.expovariate(1 / mean) if mean > 0 else 0.0
+    if dist == "lognormal":
+        # `mean` is the median; sigma controls how long the tail is
+        return random.lognormvariate(0, spread) * mean
+    return mean
+
+def fake_reply():
+    words = ["This", "is", "a", "fake", "answer", "from", "the", "local", "Groq", "stub."]
+    return " ".join(words[i % len(words)] for i in range(settings["reply_words"]))
+
+app = FastAPI(title="Fake Groq")
+
+# Distinct (host, port) pairs seen = TCP connections the clients opened
+connections = set()
+request_count = 0
+error_count = 0
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    global request_count, error_count
+    request_count += 1
+    connections.add(tuple(request.scope["client"]))
+
+    body = await request.json()
+    await asyncio.sleep(sample_latency())
+
+    if random.random() < settings["error_rate"]:
+        error_count += 1
+        status = random.choice(ERROR_STATUSES)
+        return JSONResponse(
+            status_code=status,
+            content={"error": {"message": "Injected fake Groq error", "type": "fake_error"}},
+            headers={"retry-after": "1"} if status == 429 else None
+        )
+
+    prompt_words = sum(len(str(m.get("content", "")).split()) for m in body["messages"])
+    reply = fake_reply()
+    completion_words = len(reply.split())
+    usage = {
+        "prompt_tokens": prompt_words,
+        "completion_tokens": completion_words,
+        "total_tokens": prompt_words + completion_words
+    }
+
+    if body.get("stream"):
+        return StreamingResponse(
+            stream_reply(body.get("model", "fake"), reply, usage),
+            media_type="text/event-stream"
+        )
+
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": reply},
+            "logprobs": None,
+            "finish_reason": "stop"
+        }],
+        "usage": usage
+    }
+
+async def stream_reply(model, reply, usage):
+    chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+    interval = 1 / settings["tokens_per_second"] if settings["tokens_per_second"] > 0 else 0
+    words = reply.split(" ")
+    for i, word in enumerate(words):
+        token = word if i == 0 else " " + word
+        yield sse_chunk(chunk_id, model, {"content": token}, None)
+        await asyncio.sleep(interval)
+    yield sse_chunk(chunk_id, model, {}, "stop", usage)
+    yield "data: [DONE]\n\n"
+
+def sse_chunk(chunk_id, model, delta, finish_reason, usage=None):
+    chunk = {
+        "id": chunk_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+    if usage:
+        chunk["x_groq"] = {"usage": usage}
+    return f"data: {json.dumps(chunk)}\n\n"
+
+@app.get("/stats")
+async def stats():
+    return {
+        "requests": request_count,
+        "errors": error_count,
+        "connections": len(connections),
+        "settings": settings
+    }
+
+@app.post("/stats/reset")
+async def reset_stats():
+    global request_count, error_count
+    request_count = 0
+    error_count = 0
+    connections.clear()
+    return {"reset": True}
+
+# ── RUN IN BACKGROUND ────────────────────────────────
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_in_thread(port=None, **overrides):
+    configure(**overrides)
+    port = port or free_port()
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
@@ -0,0 +1,117 @@
+from limiter import UpstreamBusy
+from session_store import call_store
+import asyncio
+
+# ── TOKEN-BUDGETED HISTORY ───────────────────────────
+# Instead of sending a session's whole history on every turn, send:
+#   system prompt + running summary of older turns + the most recent turns
+# keeping the total under max_tokens. Turns that fall out of the window are
+# folded into the summary by a background task, so the user's turn never
+# waits on summarization (the summary may lag by a turn or two).
+# A summary is only written once the window overflows, and it then folds in
+# everything except the newest low_water share of the budget; the next
+# summary waits until the turns after that fill the budget again, so one
+# summary call covers several turns instead of one per turn.
+
+def count_tokens(text):
+    # ~4 characters per token for English text; cheap and close enough for
+    # budgeting without loading a tokenizer
+    return len(text) // 4 + 1
+
+def message_tokens(message):
+    return count_tokens(message["content"]) + 4
+
+SUMMARY_PROMPT = """You maintain a running summary of a tutoring conversation.
+Merge the new turns into the existing summary. Keep the student's goals,
+progress, facts and decisions. Reply with the summary only, under {words} words."""
+
+class HistoryManager:
+    def __init__(self, sessions, get_llm, limiter=None, max_tokens=3000,
+                 summary_words=150, low_water=0.5, router=None):
+        self.sessions = sessions
+        self.get_llm = get_llm
+        self.limiter = limiter
+        # With a ModelRouter, summaries get the same deadline, retries,
+        # breakers and failover as user requests
+        self.router = router
+        self.max_tokens = max_tokens
+        self.low_water = low_water
+        self.summary_words = summary_words
+        self.pending = {}
+        self.summaries_written = 0
+
+    def window(self, session_id, history):
+        system = history[0]
+        summary, summarized_upto = self.sessions.get_summary(session_id)
+
+        prefix = [system]
+        if summary:
+            prefix.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{summary}"
+            })
+        budget = self.max_tokens - sum(message_tokens(m) for m in prefix)
+
+        # Turns before summarized_upto are already in the summary
+        start = self.fit(history, max(summarized_upto, 1), budget)
+        if start > summarized_upto:
+            # Over budget: summarize down to the low-water mark, not just the
+            # turns that fell out, so the next few turns fit without another call
+            upto = self.fit(history, start, budget * self.low_water)
+            self.schedule_summary(session_id, history, summarized_upto, upto)
+
+        return prefix + history[start:]
+
+    def fit(self, history, floor, budget):
+        # Walk back from the newest turn; always keep at least the last one
+        start = len(history)
+        while start > floor:
+            cost = message_tokens(history[start - 1])
+            if cost > budget and start < len(history):
+                break
+            budget -= cost
+            start -= 1
+        return start
+
+    def schedule_summary(self, session_id, history, summarized_upto, start):
+        if session_id in self.pending:
+            return
+        turns = history[summarized_upto:start]
+        task = asyncio.create_task(self.summarize(session_id, turns, start))
+        self.pending[session_id] = task
+        task.add_done_callback(lambda _: self.pending.pop(session_id, None))
+
+    async def summarize(self, session_id, turns, upto):
+        summary, _ = self.sessions.get_summary(session_id)
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in turns)
+        messages = [
+            {"role": "system", "content": SUMMARY_PROMPT.format(words=self.summary_words)},
+            {"role": "user", "content": f"Existing summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}"}
+        ]
+        try:
+            if self.limiter is not None:
+                async with self.limiter.slot():
+                    response = await self.invoke(messages)
+            else:
+                response = await self.invoke(messages)
+        except UpstreamBusy:
+            return  # retried on the session's next turn
+        except Exception as e:
+            print(f"⚠️ Summary refresh failed for {session_id}: {e}")
+            return
+        await call_store(self.sessions.set_summary, session_id, response.content, upto)
+        self.summaries_written += 1
+
+    async def invoke(self, messages):
+        if self.router is None:
+            return await self.get_llm().ainvoke(messages)
+        response, _ = await self.router.ainvoke(messages)
+        return response
+
+    def stats(self):
+        return {
+            "max_tokens": self.max_tokens,
+            "low_water": self.low_water,
+            "summaries_pending": len(self.pending),
+            "summaries_written": self.summaries_written
+        }
@@ -0,0 +1,106 @@
+from vector_index import normalize, top_k
+import json
+import numpy as np
+import os
+
+# ── IVF INDEX (APPROXIMATE SEARCH) ───────────────────
+# Inverted-file index for when exact search over every vector is too slow.
+# build() runs spherical k-means to get n_lists centroids and files every
+# vector under its nearest centroid; vectors are stored grouped by list so
+# each list is one contiguous slice. A query scores the centroids, then only
+# the vectors in the n_probe closest lists.
+#   n_lists  — more lists = smaller lists = faster, but more chance the true
+#              neighbour sits in a list that was not probed (default ~sqrt(N))
+#   n_probe  — lists scanned per query: the recall/speed knob at query time
+# See bench_ann.py for recall@k against exact search and queries per second.
+
+ASSIGN_BLOCK = 65_536
+
+def assign(vectors, centroids):
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_BLOCK):
+        block = vectors[start:start + ASSIGN_BLOCK]
+        labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+def kmeans(vectors, n_lists, iterations=10, sample_per_list=64, seed=0):
+    # Spherical k-means (cosine) on a sample; the full set is assigned after
+    rng = np.random.default_rng(seed)
+    n_sample = min(len(vectors), n_lists * sample_per_list)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), n_sample, replace=False))])
+    centroids = sample[rng.choice(n_sample, n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        labels = assign(sample, centroids)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=n_lists)
+        filled = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[filled]
+        centroids[filled] = np.add.reduceat(sample[order], starts, axis=0)
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            # Re-seed empty lists with random points so no centroid is wasted
+            centroids[empty] = sample[rng.choice(n_sample, len(empty), replace=False)]
+        centroids = normalize(centroids)
+    return centroids
+
+class IVFIndex:
+    def __init__(self, n_lists=None, n_probe=8, iterations=10, seed=0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids = None
+        self.vectors = None  # grouped by list
+        self.ids = None      # original row of each stored vector
+        self.offsets = None  # list i is vectors[offsets[i]:offsets[i + 1]]
+
+    def __len__(self):
+        return 0 if self.vectors is None else len(self.vectors)
+
+    def build(self, vectors):
+        vectors = normalize(vectors)
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(vectors))))
+        self.n_lists = min(n_lists, len(vectors))
+        self.centroids = kmeans(vectors, self.n_lists, self.iterations, seed=self.seed)
+        labels = assign(vectors, self.centroids)
+        order = np.argsort(labels, kind="stable")
+        self.ids = order.astype(np.int64)
+        self.vectors = vectors[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=self.n_lists))])
+        return self
+
+    def candidates(self, query, n_probe):
+        lists = top_k(self.centroids @ query, n_probe)
+        return np.concatenate([np.arange(self.offsets[i], self.offsets[i + 1]) for i in lists])
+
+    def search(self, query, k=3, n_probe=None):
+        # Returns (original indices, similarities), best first
+        query = normalize(query).reshape(-1)
+        rows = self.candidates(query, n_probe or self.n_probe)
+        scores = self.vectors[rows] @ query
+        best = top_k(scores, k)
+        return self.ids[rows[best]], scores[best]
+
+    def search_many(self, queries, k=3, n_probe=None):
+        # Lists rather than (Q, k) arrays: a query whose probed lists hold
+        # fewer than k vectors gets fewer results
+        results = [self.search(q, k, n_probe) for q in normalize(queries)]
+        return [ids for ids, _ in results], [scores for _, scores in results]
+
+    def save(self, directory):
+        # Plain .npy files so load() can memory-map the vectors
+        os.makedirs(directory, exist_ok=True)
+        for name in ("centroids", "vectors", "ids", "offsets"):
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "ivf.json"), "w", encoding="utf-8") as f:
+            json.dump({"n_lists": self.n_lists, "n_probe": self.n_probe,
+                       "iterations": self.iterations, "seed": self.seed}, f)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        with open(os.path.join(directory, "ivf.json"), encoding="utf-8") as f:
+            index = cls(**json.load(f))
+        for name in ("centroids", "vectors", "ids", "offsets"):
+            mode = "r" if mmap and name == "vectors" else None
+            setattr(index, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode))
+        return index
@@ -0,0 +1,61 @@
+from contextlib import asynccontextmanager
+import asyncio
+
+# ── UPSTREAM CONCURRENCY LIMITER ─────────────────────
+# Caps how many LLM calls are in flight at once. Extra requests wait in a
+# bounded queue; when the queue is full (or the wait times out) the caller
+# gets UpstreamBusy, which the API turns into 429 + Retry-After.
+
+class UpstreamBusy(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Too many requests in flight, retry later")
+        self.retry_after = retry_after
+
+class UpstreamLimiter:
+    def __init__(self, max_in_flight=10, max_queue=50, queue_timeout=10.0,
+                 retry_after=1):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+
+    async def acquire(self):
+        if self.semaphore.locked():
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise UpstreamBusy(self.retry_after)
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise UpstreamBusy(self.retry_after)
+            finally:
+                self.queued -= 1
+        else:
+            await self.semaphore.acquire()
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self.semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "rejected": self.rejected
+        }
@@ -0,0 +1,52 @@
+from langchain_core.callbacks import BaseCallbackHandler
+import time
+
+# ── LLM CALLBACKS ────────────────────────────────────
+# Attached to every ChatGroq in the pool, so all upstream calls (chat, rag,
+# summaries, streams) are measured in one place.
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    run_inline = True
+
+    def __init__(self, registry):
+        self.started = {}
+        self.first_token_seen = set()
+        self.duration = registry.histogram(
+            "llm_request_duration_seconds", "Upstream LLM call latency", labels=("model",))
+        # Only streamed calls report tokens as they arrive
+        self.ttft = registry.histogram(
+            "llm_time_to_first_token_seconds", "Upstream time to first streamed token",
+            labels=("model",))
+        self.prompt_tokens = registry.counter(
+            "llm_prompt_tokens_total", "Prompt tokens sent upstream", labels=("model",))
+        self.completion_tokens = registry.counter(
+            "llm_completion_tokens_total", "Completion tokens received", labels=("model",))
+        self.errors = registry.counter(
+            "llm_errors_total", "Failed upstream LLM calls", labels=("model",))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        model = (metadata or {}).get("ls_model_name", "unknown")
+        self.started[run_id] = (time.perf_counter(), model)
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        if run_id in self.started and run_id not in self.first_token_seen:
+            self.first_token_seen.add(run_id)
+            start, model = self.started[run_id]
+            self.ttft.observe(time.perf_counter() - start, model)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        start, model = self.started.pop(run_id, (None, "unknown"))
+        self.first_token_seen.discard(run_id)
+        if start is not None:
+            self.duration.observe(time.perf_counter() - start, model)
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    self.prompt_tokens.inc(usage["input_tokens"], model)
+                    self.completion_tokens.inc(usage["output_tokens"], model)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        _, model = self.started.pop(run_id, (None, "unknown"))
+        self.first_token_seen.discard(run_id)
+        self.errors.inc(1, model)
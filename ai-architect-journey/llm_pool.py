@@ -0,0 +1,44 @@
+import httpx
+from langchain_groq import ChatGroq
+
+# ── SHARED LLM CLIENTS ───────────────────────────────
+# One httpx connection pool per process. Every ChatGroq built here rides on
+# the same keep-alive connections, so a request only pays for the TLS
+# handshake when the pool has no idle connection left.
+
+class LLMPool:
+    def __init__(self, api_key, base_url=None, pool_size=20,
+                 keepalive_seconds=30.0, timeout=60.0, callbacks=None, max_retries=2):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.callbacks = callbacks
+        self.max_retries = max_retries  # 0 when resilience.py does the retrying
+        self.pool_size = pool_size
+        limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=keepalive_seconds
+        )
+        self.http_client = httpx.Client(limits=limits, timeout=timeout)
+        self.http_async_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+        self.models = {}
+
+    def get(self, model_name):
+        llm = self.models.get(model_name)
+        if llm is None:
+            llm = ChatGroq(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                model_name=model_name,
+                http_client=self.http_client,
+                http_async_client=self.http_async_client,
+                callbacks=self.callbacks,
+                max_retries=self.max_retries
+            )
+            self.models[model_name] = llm
+        return llm
+
+    async def aclose(self):
+        self.models.clear()
+        self.http_client.close()
+        await self.http_async_client.aclose()
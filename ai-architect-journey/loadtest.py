@@ -0,0 +1,216 @@
+from datetime import datetime
+from fake_groq import free_port
+import argparse
+import asyncio
+import httpx
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# ── LOAD TEST ────────────────────────────────────────
+# Starts fake_groq.py and day12_deploy.py as real uvicorn processes, then
+# drives each endpoint at several concurrency levels and reports RPS,
+# p50/p95/p99 latency and errors. Results go to a JSON file tagged with
+# the git commit so runs can be compared:
+#
+#   python loadtest.py --concurrency 1 8 32 --duration 10 --out before.json
+#   python loadtest.py --concurrency 1 8 32 --duration 10 --compare before.json
+
+ENDPOINTS = ("health", "sessions", "chat", "rag")
+
+DOCUMENTS = [
+    "Day 4: Built RAG system using keyword matching to answer from documents.",
+    "Day 9: Vector embeddings convert text into numbers so computers can find similar meanings.",
+    "AI Architect salary: Year 1-2 is 12-25 LPA, Year 3-4 is 30-60 LPA, Year 5-7 is 70-120 LPA.",
+    "LangChain is the industry standard framework used in 80% of production AI apps.",
+]
+
+def make_request(endpoint, n, unique):
+    # With unique=True every question differs, so caches and single-flight
+    # cannot hide the upstream cost
+    tag = f" #{n}" if unique else ""
+    if endpoint == "chat":
+        return "POST", "/chat", {"message": f"What should I learn next?{tag}", "session_id": f"load-{n % 50}"}
+    if endpoint == "rag":
+        return "POST", "/rag", {"question": f"What is the salary in year 3?{tag}", "documents": DOCUMENTS}
+    if endpoint == "sessions":
+        return "GET", "/sessions", None
+    return "GET", "/health", None
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values)) - 1))
+    return round(sorted_values[rank], 2)
+
+async def drive(base_url, endpoint, concurrency, duration, unique):
+    latencies = []
+    errors = {}
+    counter = [0]
+    deadline = time.perf_counter() + duration
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def user():
+            while time.perf_counter() < deadline:
+                counter[0] += 1
+                method, path, body = make_request(endpoint, counter[0], unique)
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    status = response.status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                elapsed = (time.perf_counter() - start) * 1000
+                if status == 200:
+                    latencies.append(elapsed)
+                else:
+                    errors[str(status)] = errors.get(str(status), 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*[user() for _ in range(concurrency)])
+        wall = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies) + sum(errors.values())
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": sum(errors.values()),
+        "error_codes": errors,
+        "rps": round(total / wall, 1),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+def start_server(module, port, env, ready_path="/openapi.json", ready_checks=1):
+    # Waits until ready_path answers 200 ready_checks times in a row (with
+    # several workers each check may land on a different one)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module, "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"] + env.pop("_extra_args", []),
+        env={**os.environ, **env},
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    url = f"http://127.0.0.1:{port}"
+    passed = 0
+    last = None
+    for _ in range(600):
+        try:
+            last = httpx.get(url + ready_path, timeout=1)
+            passed = passed + 1 if last.status_code == 200 else 0
+            if passed >= ready_checks:
+                return process, url
+        except httpx.HTTPError:
+            passed = 0
+        time.sleep(0.1)
+    process.terminate()
+    detail = f": {last.status_code} {last.text}" if last is not None else ""
+    raise RuntimeError(f"{module} was not ready on port {port}{detail}")
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["endpoint"], r["concurrency"]): r for r in json.load(f)["results"]}
+    print(f"\n📈 Compared with {baseline_path}")
+    for r in results:
+        old = baseline.get((r["endpoint"], r["concurrency"]))
+        if not old:
+            continue
+        rps = (r["rps"] - old["rps"]) / old["rps"] * 100 if old["rps"] else 0
+        p99 = ((r["p99_ms"] - old["p99_ms"]) / old["p99_ms"] * 100
+               if old["p99_ms"] and r["p99_ms"] else 0)
+        print(f"  {r['endpoint']:<9} c={r['concurrency']:<4} rps {rps:+6.1f}%   p99 {p99:+6.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test day12_deploy against a fake Groq")
+    parser.add_argument("--endpoints", nargs="+", default=list(ENDPOINTS), choices=ENDPOINTS)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=5, help="seconds per run")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the API")
+    parser.add_argument("--cacheable", action="store_true",
+                        help="repeat identical questions so caches can hit")
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--latency-dist", default="lognormal",
+                        choices=["fixed", "uniform", "exponential", "lognormal"])
+    parser.add_argument("--latency-spread", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--out", default="loadtest_results.json")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    fake_settings = {
+        "FAKE_GROQ_LATENCY_MS": str(args.latency_ms),
+        "FAKE_GROQ_LATENCY_DIST": args.latency_dist,
+        "FAKE_GROQ_LATENCY_SPREAD": str(args.latency_spread),
+        "FAKE_GROQ_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "FAKE_GROQ_ERROR_RATE": str(args.error_rate),
+    }
+    groq, groq_url = start_server("fake_groq:app", free_port(), dict(fake_settings))
+    api_env = {"GROQ_BASE_URL": groq_url, "GROQ_API_KEY": "fake"}
+    # Shared SQLite sessions (plus -wal/-shm) live in a temp dir, removed at the end
+    scratch = tempfile.mkdtemp(prefix="loadtest_")
+    if args.workers > 1:
+        api_env["SESSION_BACKEND"] = "sqlite"
+        api_env["SESSION_DB"] = os.path.join(scratch, "sessions.db")
+        api_env["_extra_args"] = ["--workers", str(args.workers)]
+    # Wait for /ready so warm-up (imports, first connection) is not measured
+    try:
+        api, api_url = start_server("day12_deploy:app", free_port(), api_env,
+                                    ready_path="/ready", ready_checks=2 * args.workers)
+    except RuntimeError:
+        groq.terminate()
+        shutil.rmtree(scratch, ignore_errors=True)
+        raise
+
+    print(f"🚀 API {api_url} ({args.workers} worker(s)) → fake Groq {groq_url}")
+    print(f"{'endpoint':<9} {'conc':>4} {'reqs':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>6}")
+    results = []
+    try:
+        for endpoint in args.endpoints:
+            for concurrency in args.concurrency:
+                r = asyncio.run(drive(api_url, endpoint, concurrency, args.duration,
+                                      unique=not args.cacheable))
+                results.append(r)
+                print(f"{endpoint:<9} {concurrency:>4} {r['requests']:>6} {r['rps']:>8} "
+                      f"{r['p50_ms']!s:>8} {r['p95_ms']!s:>8} {r['p99_ms']!s:>8} {r['errors']:>6}")
+    finally:
+        api.terminate()
+        groq.terminate()
+        api.wait()
+        groq.wait()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "settings": {
+            "duration": args.duration,
+            "workers": args.workers,
+            "cacheable": args.cacheable,
+            "fake_groq": fake_settings
+        },
+        "results": results
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results written to {args.out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
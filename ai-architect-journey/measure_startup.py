@@ -0,0 +1,86 @@
+from fake_groq import free_port
+import argparse
+import httpx
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# ── COLD START MEASUREMENT ───────────────────────────
+# Measures what a freshly started dyno costs:
+#   1. `import day12_deploy` in a fresh interpreter (median of N runs)
+#   2. process spawn → first /health 200 → /ready 200
+#   3. latency of the first and second /chat request
+# Runs against a local fake Groq unless --real is given (needs GROQ_API_KEY).
+#
+#   python measure_startup.py --runs 5
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def import_time():
+    code = "import time; t = time.perf_counter(); import day12_deploy; print(time.perf_counter() - t)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                            text=True, cwd=HERE, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def wait_for(url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return time.perf_counter()
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+def spawn(module, port, env):
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module, "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **env}, cwd=HERE
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure day12_deploy cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--real", action="store_true", help="use the real Groq API")
+    args = parser.parse_args()
+
+    imports = [import_time() for _ in range(args.runs)]
+    print(f"📦 import day12_deploy: median {statistics.median(imports) * 1000:.0f} ms "
+          f"(min {min(imports) * 1000:.0f}, max {max(imports) * 1000:.0f})")
+
+    env = {}
+    groq = None
+    if not args.real:
+        groq_port = free_port()
+        groq = spawn("fake_groq:app", groq_port, {})
+        wait_for(f"http://127.0.0.1:{groq_port}/stats", time.perf_counter() + 30)
+        env = {"GROQ_BASE_URL": f"http://127.0.0.1:{groq_port}", "GROQ_API_KEY": "fake"}
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    api = spawn("day12_deploy:app", port, env)
+    try:
+        healthy = wait_for(f"{url}/health", start + 60)
+        ready = wait_for(f"{url}/ready", start + 120)
+        print(f"💚 spawn → /health 200: {(healthy - start) * 1000:.0f} ms")
+        print(f"🟢 spawn → /ready 200:  {(ready - start) * 1000:.0f} ms")
+
+        for label in ("first", "second"):
+            t = time.perf_counter()
+            response = httpx.post(f"{url}/chat", json={"message": "Hi!", "session_id": "startup"},
+                                  timeout=60)
+            print(f"💬 {label} /chat: {(time.perf_counter() - t) * 1000:.0f} ms "
+                  f"(status {response.status_code})")
+    finally:
+        api.terminate()
+        api.wait()
+        if groq is not None:
+            groq.terminate()
+            groq.wait()
+
+if __name__ == "__main__":
+    main()
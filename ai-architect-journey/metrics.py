@@ -0,0 +1,154 @@
+from bisect import bisect_left
+import threading
+import time
+
+# ── METRICS ──────────────────────────────────────────
+# A small Prometheus-compatible registry: counters, gauges and histograms
+# with labels, rendered in the text exposition format on /metrics. Recording
+# a sample is a dict lookup plus a bisect, cheap enough to leave on.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+def format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{str(v).replace(chr(34), chr(39))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, *label_values):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        for label_values, value in list(self.values.items()):
+            yield self.name, format_labels(self.labels, label_values), value
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def __init__(self, name, help, labels=(), read=None):
+        super().__init__(name, help, labels)
+        self.read = read  # optional callback, read at scrape time
+
+    def set(self, value, *label_values):
+        self.values[label_values] = value
+
+    def samples(self):
+        if self.read is not None:
+            self.set(self.read())
+        yield from super().samples()
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            i = bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        bucket_labels = self.labels + ("le",)
+        for label_values, (counts, total, count) in list(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield (f"{self.name}_bucket",
+                       format_labels(bucket_labels, label_values + (bound,)), cumulative)
+            yield (f"{self.name}_bucket",
+                   format_labels(bucket_labels, label_values + ("+Inf",)), count)
+            yield f"{self.name}_sum", format_labels(self.labels, label_values), total
+            yield f"{self.name}_count", format_labels(self.labels, label_values), count
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, metric):
+        for existing in self.metrics:
+            if existing.name == metric.name:
+                return existing
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.add(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=(), read=None):
+        return self.add(Gauge(name, help, labels, read))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self.add(Histogram(name, help, labels, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+# ── HTTP MIDDLEWARE ──────────────────────────────────
+# Plain ASGI (not BaseHTTPMiddleware) so streaming responses pass straight
+# through; duration runs until the last body chunk is sent.
+
+class MetricsMiddleware:
+    def __init__(self, app, registry):
+        self.app = app
+        self.in_flight = registry.gauge(
+            "http_requests_in_flight", "HTTP requests currently being served")
+        self.duration = registry.histogram(
+            "http_request_duration_seconds", "HTTP request latency",
+            labels=("method", "route", "status"))
+        self.in_flight.set(0)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        self.in_flight.inc(1)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight.inc(-1)
+            route = scope.get("route")
+            # Label by route template (/collections/{collection_id}), never by
+            # raw path, so label cardinality stays bounded
+            self.duration.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status[0]
+            )
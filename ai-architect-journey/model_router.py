@@ -0,0 +1,205 @@
+from history import count_tokens
+import asyncio
+import re
+import time
+
+# ── MODEL ROUTER ─────────────────────────────────────
+# Picks which Groq model answers a prompt. Short, simple questions go to a
+# small instant model; everything else goes to the primary model. Each model
+# keeps an EWMA of its latency and error rate:
+#   - a model whose error rate passes max_error_rate is skipped for
+#     cooldown_seconds, then gets one probe call to see if it recovered
+#   - the fast model is only used while its EWMA latency is below the
+#     primary's (a "fast" model that is slower than the big one is pointless);
+#     every probe_every-th simple prompt still goes to it so the EWMA can
+#     recover from a slow spell
+#   - when the chosen model fails, the call fails over to the next one
+# With a Resilience object (resilience.py) each model call also gets
+# retries and a per-model circuit breaker, and one deadline covers the whole
+# call: a failover gets whatever time the failed model left, not a fresh one.
+#
+# Routing heuristics (all configurable):
+#   fast_max_tokens   — the user's last message must be at most this long
+#   fast_max_context  — the whole prompt (history, RAG context) at most this
+#   complex_words     — any of these in the question keeps it on the primary
+
+COMPLEX_WORDS = ("explain", "why", "compare", "design", "architecture", "code",
+                 "step by step", "analyze", "analyse", "debug", "plan", "prove")
+
+def last_user_text(messages):
+    for message in reversed(messages):
+        if isinstance(message, tuple):
+            role, content = message
+        else:
+            role, content = message["role"], message["content"]
+        if role in ("user", "human"):
+            return content
+    return ""
+
+def message_text(message):
+    return message[1] if isinstance(message, tuple) else message["content"]
+
+class ModelHealth:
+    def __init__(self, name):
+        self.name = name
+        self.latency = None  # EWMA seconds, successful calls only
+        self.successes = 0
+        self.error_rate = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.degraded_until = 0.0
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "ewma_latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "ewma_error_rate": round(self.error_rate, 3),
+            "degraded": self.degraded_until > time.monotonic()
+        }
+
+class ModelRouter:
+    def __init__(self, get_model, primary, fast=None, fast_max_tokens=40,
+                 fast_max_context=1500, complex_words=COMPLEX_WORDS, alpha=0.2,
+                 max_error_rate=0.5, cooldown_seconds=30.0, probe_every=10,
+                 resilience=None):
+        self.get_model = get_model
+        self.resilience = resilience
+        self.primary = primary
+        self.fast = fast
+        self.fast_max_tokens = fast_max_tokens
+        self.fast_max_context = fast_max_context
+        self.complex_pattern = re.compile(
+            r"\b(" + "|".join(re.escape(w) for w in complex_words) + r")\b", re.IGNORECASE)
+        self.alpha = alpha
+        self.max_error_rate = max_error_rate
+        self.cooldown_seconds = cooldown_seconds
+        self.probe_every = probe_every
+        self.simple_prompts = 0
+        self.health = {name: ModelHealth(name) for name in (primary, fast) if name}
+        self.routed = {name: 0 for name in self.health}
+        self.failovers = 0
+
+    def is_simple(self, messages):
+        question = last_user_text(messages)
+        if count_tokens(question) > self.fast_max_tokens:
+            return False
+        if sum(count_tokens(message_text(m)) for m in messages) > self.fast_max_context:
+            return False
+        return not self.complex_pattern.search(question)
+
+    def intended(self, messages):
+        # The model this prompt is routed to when every model is healthy;
+        # unlike candidates() it ignores health, so it is stable per prompt
+        if self.fast and self.is_simple(messages):
+            return self.fast
+        return self.primary
+
+    def available(self, name):
+        return self.health[name].degraded_until <= time.monotonic()
+
+    def candidates(self, messages):
+        # Models to try, in order; degraded models go last rather than
+        # disappearing, so a call still has somewhere to go if all are down
+        order = [self.primary]
+        if self.fast:
+            fast, primary = self.health[self.fast], self.health[self.primary]
+            fast_is_faster = (fast.latency is None or primary.latency is None
+                              or fast.latency < primary.latency)
+            simple = self.is_simple(messages)
+            if simple:
+                self.simple_prompts += 1
+                if not fast_is_faster and self.simple_prompts % self.probe_every == 0:
+                    fast_is_faster = True  # probe
+            if simple and fast_is_faster:
+                order.insert(0, self.fast)
+            else:
+                order.append(self.fast)
+        return ([name for name in order if self.available(name)]
+                + [name for name in order if not self.available(name)])
+
+    def record(self, name, seconds=None, error=False):
+        health = self.health[name]
+        health.calls += 1
+        health.error_rate += self.alpha * ((1.0 if error else 0.0) - health.error_rate)
+        if error:
+            health.errors += 1
+            if health.error_rate > self.max_error_rate:
+                health.degraded_until = time.monotonic() + self.cooldown_seconds
+        else:
+            health.successes += 1
+            # The first call pays one-off client setup; it is not a fair sample
+            if health.successes == 2:
+                health.latency = seconds
+            elif health.successes > 2:
+                health.latency += self.alpha * (seconds - health.latency)
+            health.degraded_until = 0.0
+
+    def invoke(self, name, messages, deadline=None):
+        llm = self.get_model(name)
+        if self.resilience is None:
+            return llm.ainvoke(messages)
+        return self.resilience.call(lambda: llm.ainvoke(messages), key=name, deadline=deadline)
+
+    def stream(self, name, messages, deadline=None):
+        llm = self.get_model(name)
+        if self.resilience is None:
+            return llm.astream(messages)
+        return self.resilience.stream(lambda: llm.astream(messages), key=name, deadline=deadline)
+
+    def deadline(self):
+        return None if self.resilience is None else self.resilience.deadline_from_now()
+
+    def expired(self, deadline):
+        # No time left to fail over; the next model would only be charged
+        # an error it never had a chance to avoid
+        return deadline is not None and asyncio.get_running_loop().time() >= deadline
+
+    async def ainvoke(self, messages):
+        # Returns (response, model name)
+        names = self.candidates(messages)
+        deadline = self.deadline()
+        for i, name in enumerate(names):
+            start = time.perf_counter()
+            try:
+                response = await self.invoke(name, messages, deadline)
+            except Exception:
+                self.record(name, error=True)
+                if i == len(names) - 1 or self.expired(deadline):
+                    raise
+                self.failovers += 1
+                continue
+            self.record(name, time.perf_counter() - start)
+            self.routed[name] += 1
+            return response, name
+
+    async def astream(self, messages):
+        # Yields (model name, chunk). Fails over only until the first chunk
+        # has gone out; after that an error is the caller's to report
+        names = self.candidates(messages)
+        deadline = self.deadline()
+        for i, name in enumerate(names):
+            start = time.perf_counter()
+            streamed = False
+            try:
+                async for chunk in self.stream(name, messages, deadline):
+                    streamed = True
+                    yield name, chunk
+            except Exception:
+                self.record(name, error=True)
+                if streamed or i == len(names) - 1 or self.expired(deadline):
+                    raise
+                self.failovers += 1
+                continue
+            self.record(name, time.perf_counter() - start)
+            self.routed[name] += 1
+            return
+
+    def stats(self):
+        return {
+            "primary": self.primary,
+            "fast": self.fast,
+            "routed": dict(self.routed),
+            "failovers": self.failovers,
+            "models": {name: health.stats() for name, health in self.health.items()}
+        }
@@ -0,0 +1,157 @@
+from collections import OrderedDict
+from urllib.parse import parse_qs
+from fastapi import APIRouter, Header, HTTPException
+import cProfile
+import hmac
+import os
+import pstats
+import random
+import time
+import uuid
+
+# ── REQUEST PROFILING ────────────────────────────────
+# Two ways to see where a request's time goes, both off unless PROFILE_TOKEN
+# is set:
+#   on demand — send `X-Profile: <token>` (or ?profile=<token>); that one
+#               request runs under cProfile, the response carries an
+#               X-Profile-Id header and GET /debug/profiles/{id} returns the
+#               top functions by cumulative time
+#   sampling  — a fraction of requests (PROFILE_SAMPLE_RATE, adjustable at
+#               runtime via POST /debug/profiling) is profiled and merged
+#               into one pstats file per process under PROFILE_DIR
+# cProfile sees the whole event loop thread, so other requests running
+# concurrently show up in the profile too. Only one request is profiled at
+# a time.
+
+class Profiler:
+    def __init__(self, token=None, sample_rate=0.0, directory="profiles",
+                 top_n=25, keep=20, flush_every=20):
+        self.token = token
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.top_n = top_n
+        self.keep = keep
+        self.flush_every = flush_every
+        self.active = False
+        self.profiles = OrderedDict()
+        self.aggregate = None
+        self.samples = 0
+
+    def authorized(self, value):
+        return bool(self.token) and value is not None and hmac.compare_digest(value.encode(), self.token.encode())
+
+    def summarize(self, profile, path, elapsed):
+        stats = pstats.Stats(profile).sort_stats("cumulative")
+        top = []
+        for func in stats.fcn_list[:self.top_n]:
+            primitive_calls, calls, total_time, cumulative_time, _ = stats.stats[func]
+            filename, line, name = func
+            top.append({
+                "function": f"{name} ({os.path.basename(filename)}:{line})",
+                "calls": calls,
+                "total_ms": round(total_time * 1000, 3),
+                "cumulative_ms": round(cumulative_time * 1000, 3)
+            })
+        return {"path": path, "elapsed_ms": round(elapsed * 1000, 3), "top": top}
+
+    def store(self, profile_id, summary):
+        self.profiles[profile_id] = summary
+        while len(self.profiles) > self.keep:
+            self.profiles.popitem(last=False)
+
+    def add_sample(self, profile):
+        if self.aggregate is None:
+            self.aggregate = pstats.Stats(profile)
+        else:
+            self.aggregate.add(profile)
+        self.samples += 1
+        if self.samples % self.flush_every == 0:
+            self.flush()
+
+    def flush(self):
+        if self.aggregate is None:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"sampled-{os.getpid()}.pstats")
+        self.aggregate.dump_stats(path)
+        return path
+
+class ProfilingMiddleware:
+    def __init__(self, app, profiler):
+        self.app = app
+        self.profiler = profiler
+
+    def requested(self, scope):
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                return self.profiler.authorized(value.decode("latin-1"))
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        if "profile" in query:
+            return self.profiler.authorized(query["profile"][0])
+        return False
+
+    async def __call__(self, scope, receive, send):
+        profiler = self.profiler
+        if (scope["type"] != "http" or not profiler.token or profiler.active
+                or scope["path"].startswith("/debug/")):
+            return await self.app(scope, receive, send)
+
+        on_demand = self.requested(scope)
+        sampled = not on_demand and random.random() < profiler.sample_rate
+        if not (on_demand or sampled):
+            return await self.app(scope, receive, send)
+
+        profile_id = uuid.uuid4().hex[:12]
+
+        async def send_wrapper(message):
+            if on_demand and message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]
+            await send(message)
+
+        profiler.active = True
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.disable()
+            profiler.active = False
+            if on_demand:
+                profiler.store(profile_id, profiler.summarize(
+                    profile, scope["path"], time.perf_counter() - start))
+            else:
+                profiler.add_sample(profile)
+
+def profiling_routes(profiler):
+    router = APIRouter(prefix="/debug", include_in_schema=False)
+
+    def check(token):
+        # Hide the routes entirely unless the caller knows the token
+        if not profiler.authorized(token):
+            raise HTTPException(status_code=404, detail="Not Found")
+
+    @router.get("/profiles/{profile_id}")
+    async def get_profile(profile_id: str, x_profile: str | None = Header(default=None)):
+        check(x_profile)
+        summary = profiler.profiles.get(profile_id)
+        if summary is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return summary
+
+    @router.post("/profiling")
+    async def set_sampling(sample_rate: float, x_profile: str | None = Header(default=None)):
+        check(x_profile)
+        if not 0 <= sample_rate <= 1:
+            raise HTTPException(status_code=400, detail="sample_rate must be between 0 and 1")
+        profiler.sample_rate = sample_rate
+        return {
+            "sample_rate": sample_rate,
+            "samples": profiler.samples,
+            "written_to": profiler.flush()
+        }
+
+    return router
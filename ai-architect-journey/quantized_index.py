@@ -0,0 +1,89 @@
+from vector_index import normalize, top_k
+import numpy as np
+
+# ── QUANTIZED INDEX ──────────────────────────────────
+# Keeps a compact copy of the (normalized) document vectors in RAM and uses
+# it for the first pass; the best k * rescore candidates are then scored
+# again against the float32 vectors, which can stay on disk as the
+# memory-mapped matrix from embedding_store.py. Modes:
+#   float16 — half the memory of float32
+#   int8    — a quarter; each dimension gets its own scale so a dimension
+#             with a small range does not lose all its precision
+# NumPy has no fast float16/int8 matmul, so the first pass converts blocks to
+# float32 on the fly; memory stays compact and only a block is ever widened.
+# stats() and recall() report the footprint and recall loss vs float32.
+
+SCORE_BLOCK = 65_536
+MODES = ("float16", "int8")
+
+class QuantizedIndex:
+    def __init__(self, vectors, mode="int8", rescore=4, normalized=False):
+        if mode not in MODES:
+            raise ValueError(f"Unknown quantization mode: {mode}")
+        self.mode = mode
+        self.rescore = rescore
+        # float32 vectors for re-scoring; a memmap keeps them out of RAM
+        self.full = vectors if normalized else normalize(vectors)
+        self.scale = None
+        self.codes = np.empty(self.full.shape, dtype=np.float16 if mode == "float16" else np.int8)
+        if mode == "int8":
+            self.scale = np.zeros(self.full.shape[1], dtype=np.float32)
+            for start in range(0, len(self.full), SCORE_BLOCK):
+                block = np.abs(self.full[start:start + SCORE_BLOCK])
+                self.scale = np.maximum(self.scale, block.max(axis=0))
+            self.scale = np.maximum(self.scale, 1e-10) / 127
+        for start in range(0, len(self.full), SCORE_BLOCK):
+            block = np.asarray(self.full[start:start + SCORE_BLOCK])
+            if mode == "int8":
+                block = np.clip(np.rint(block / self.scale), -127, 127)
+            self.codes[start:start + len(block)] = block
+
+    def __len__(self):
+        return len(self.codes)
+
+    def approximate_scores(self, queries):
+        # queries: (Q, dim) unit vectors -> (Q, N) scores from the compact copy
+        if self.mode == "int8":
+            queries = queries * self.scale  # codes * scale @ q == codes @ (scale * q)
+        scores = np.empty((len(queries), len(self.codes)), dtype=np.float32)
+        for start in range(0, len(self.codes), SCORE_BLOCK):
+            block = self.codes[start:start + SCORE_BLOCK].astype(np.float32)
+            scores[:, start:start + len(block)] = queries @ block.T
+        return scores
+
+    def search_many(self, queries, k=3, rescore=None):
+        # rescore=0 ranks on the compact scores alone
+        rescore = self.rescore if rescore is None else rescore
+        queries = normalize(queries).reshape(-1, self.codes.shape[1])
+        approximate = self.approximate_scores(queries)
+        if not rescore:
+            indices = top_k(approximate, k)
+            return indices, np.take_along_axis(approximate, indices, axis=1)
+        # Exact float32 scores for the shortlist only; sorted so reads from a
+        # memmap move forward through the file
+        shortlist = np.sort(top_k(approximate, k * rescore), axis=1)
+        exact = np.einsum("qcd,qd->qc", self.full[shortlist], queries)
+        best = top_k(exact, k)
+        return (np.take_along_axis(shortlist, best, axis=1),
+                np.take_along_axis(exact, best, axis=1))
+
+    def search(self, query, k=3, rescore=None):
+        indices, scores = self.search_many(query, k, rescore)
+        return indices[0], scores[0]
+
+    def recall(self, queries, k=10, rescore=None):
+        # Share of the exact float32 top-k this index finds
+        queries = normalize(queries)
+        truth = top_k(queries @ np.asarray(self.full).T, k)
+        found, _ = self.search_many(queries, k, rescore)
+        return float(np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)]))
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "vectors": len(self.codes),
+            "rescore": self.rescore,
+            "resident_bytes": self.codes.nbytes + (self.scale.nbytes if self.scale is not None else 0),
+            "float32_bytes": len(self.codes) * self.codes.shape[1] * 4,
+            "full_vectors_mapped": isinstance(self.full, np.memmap)
+        }
@@ -0,0 +1,147 @@
+from collections import OrderedDict
+import asyncio
+import numpy as np
+import re
+import time
+
+# ── QUERY EMBEDDER ───────────────────────────────────
+# Embedding one query per encode() call wastes most of the model's time on
+# per-call overhead, and popular questions get embedded over and over.
+#   cache      — LRU of query vectors keyed by normalized text (trimmed,
+#                whitespace collapsed, casefolded; all-MiniLM-L6-v2 is an
+#                uncased model, so case never changed the vector anyway)
+#   batching   — concurrent embed() calls are held for up to max_wait_ms and
+#                encoded together, up to max_batch_size texts per call. One
+#                batch is encoded at a time (in a worker thread); requests
+#                arriving meanwhile form the next batch.
+# Vectors come back normalized, ready for cosine search.
+
+def normalize_text(text):
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+class QueryEmbedder:
+    def __init__(self, encode, max_entries=10_000, max_batch_size=32, max_wait_ms=5.0):
+        self.encode = encode  # list of texts -> (n, dim) array
+        self.max_entries = max_entries
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.cache = OrderedDict()
+        self.pending = OrderedDict()  # normalized text -> future, not yet encoding
+        self.waiting = {}             # normalized text -> future, queued or encoding
+        self.timer = None
+        self.worker = None
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+        self.encoded = 0
+        self.largest_batch = 0
+        self.encode_seconds = 0.0
+
+    def cached(self, key):
+        vector = self.cache.get(key)
+        if vector is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+        return vector
+
+    def remember(self, key, vector):
+        self.cache[key] = vector
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+    def encode_batch(self, texts):
+        start = time.perf_counter()
+        vectors = np.asarray(self.encode(texts), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-10
+        self.encode_seconds += time.perf_counter() - start
+        self.batches += 1
+        self.encoded += len(texts)
+        self.largest_batch = max(self.largest_batch, len(texts))
+        return vectors
+
+    # ── async, for the API ──
+    async def embed(self, text):
+        key = normalize_text(text)
+        vector = self.cached(key)
+        if vector is not None:
+            return vector
+        self.misses += 1
+        future = self.waiting.get(key)
+        if future is None:
+            # Identical queries already waiting share one slot in the batch
+            future = asyncio.get_running_loop().create_future()
+            self.waiting[key] = future
+            self.pending[key] = future
+            if len(self.pending) >= self.max_batch_size:
+                self.flush()
+            elif self.timer is None and self.worker is None:
+                self.timer = asyncio.get_running_loop().call_later(self.max_wait, self.flush)
+        return await asyncio.shield(future)
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.worker is None:
+            self.worker = asyncio.ensure_future(self.drain())
+
+    async def drain(self):
+        # While a batch encodes, new requests pile up in pending and go out
+        # together as the next batch, without waiting for another timer
+        try:
+            while self.pending:
+                batch = []
+                while self.pending and len(batch) < self.max_batch_size:
+                    batch.append(self.pending.popitem(last=False))
+                await self.run_batch(batch)
+        finally:
+            self.worker = None
+
+    async def run_batch(self, batch):
+        texts = [key for key, _ in batch]
+        try:
+            vectors = await asyncio.to_thread(self.encode_batch, texts)
+        except Exception as e:
+            for key, future in batch:
+                self.waiting.pop(key, None)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (key, future), vector in zip(batch, vectors):
+            self.remember(key, vector)
+            self.waiting.pop(key, None)
+            if not future.done():
+                future.set_result(vector)
+
+    # ── sync, for scripts like day9 ──
+    def embed_many_sync(self, texts):
+        keys = [normalize_text(text) for text in texts]
+        vectors = [self.cached(key) for key in keys]
+        missing = list(dict.fromkeys(key for key, v in zip(keys, vectors) if v is None))
+        if missing:
+            self.misses += len(missing)
+            fresh = dict(zip(missing, self.encode_batch(missing)))
+            for key, vector in fresh.items():
+                self.remember(key, vector)
+            vectors = [v if v is not None else fresh[key] for key, v in zip(keys, vectors)]
+        return np.stack(vectors)
+
+    def embed_sync(self, text):
+        return self.embed_many_sync([text])[0]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "cached": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "encoded": self.encoded,
+            "avg_batch_size": round(self.encoded / self.batches, 2) if self.batches else None,
+            "largest_batch": self.largest_batch,
+            "encodes_per_second": round(self.encoded / self.encode_seconds, 1) if self.encode_seconds else None
+        }
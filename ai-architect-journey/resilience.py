@@ -0,0 +1,278 @@
+from collections import deque
+import asyncio
+import random
+import time
+
+# ── UPSTREAM RESILIENCE ──────────────────────────────
+# Wraps every Groq call with:
+#   deadline    — the whole call, retries included, gives up after this many
+#                 seconds (UpstreamTimeout → 504) instead of holding a worker
+#   retries     — 429 / 5xx / connection errors are retried up to
+#                 max_retries times with exponential backoff and full jitter,
+#                 honouring Retry-After when Groq sends one
+#   hedging     — optional: if an attempt is still running after the p95 of
+#                 recent latencies for the same key, a second identical
+#                 request is sent and whichever answers first wins
+#   breaker     — after failure_threshold consecutive failed calls (retries
+#                 exhausted; 5xx, connection errors and timeouts, not 429s,
+#                 which are backpressure rather than an outage) the circuit
+#                 opens and calls fail fast (CircuitOpen → 503) for
+#                 reset_seconds; then one trial call decides whether it closes
+# call() and stream() take an optional absolute deadline (event loop time) so
+# a caller trying several models in turn can share one budget between them.
+# Breakers and latency samples are kept per key (one per model), so the
+# model router can fail over while one model's circuit is open and the hedge
+# delay for the 8B model is not set by the 70B model's latencies.
+#
+# The Groq SDK retries on its own by default; build the clients with
+# max_retries=0 so retries are only counted here.
+
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+class CircuitOpen(Exception):
+    def __init__(self, key, retry_after):
+        super().__init__(f"Upstream {key} is failing; circuit open, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+class UpstreamTimeout(Exception):
+    pass
+
+def status_code(exc):
+    code = getattr(exc, "status_code", None)
+    if code is None and getattr(exc, "response", None) is not None:
+        code = getattr(exc.response, "status_code", None)
+    return code
+
+def is_retryable(exc):
+    code = status_code(exc)
+    if code is not None:
+        return code in RETRYABLE_STATUSES
+    # No HTTP status: timeouts and dropped connections (groq.APIConnectionError
+    # and its APITimeoutError subclass, raw httpx transport errors)
+    return isinstance(exc, (asyncio.TimeoutError, ConnectionError)) or type(exc).__name__ in (
+        "APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout",
+        "RemoteProtocolError", "ReadError")
+
+def retry_after(exc):
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+def p95(samples):
+    ordered = sorted(samples)
+    return ordered[max(0, int(len(ordered) * 0.95) - 1)]
+
+class CircuitBreaker:
+    def __init__(self, key, failure_threshold=5, reset_seconds=30.0):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0  # consecutive
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def allow(self):
+        if self.state == "open":
+            wait = self.opened_at + self.reset_seconds - time.monotonic()
+            if wait > 0:
+                self.rejected += 1
+                raise CircuitOpen(self.key, max(1, round(wait)))
+            self.state = "half_open"  # let one trial call through
+        elif self.state == "half_open":
+            # A trial call is already out; everyone else keeps failing fast
+            self.rejected += 1
+            raise CircuitOpen(self.key, 1)
+
+    def success(self):
+        self.state = "closed"
+        self.failures = 0
+
+    def failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        # Trial call ended without telling us anything (e.g. a 400)
+        if self.state == "half_open":
+            self.state = "closed"
+
+    def failed(self, exc):
+        if status_code(exc) == 429:
+            self.release()
+        else:
+            self.failure()
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected
+        }
+
+class Resilience:
+    def __init__(self, deadline=30.0, max_retries=2, backoff_base=0.25,
+                 backoff_max=4.0, hedge=False, hedge_min_delay=0.5,
+                 hedge_min_samples=20, failure_threshold=5, reset_seconds=30.0):
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.breakers = {}
+        self.latencies = {}  # key -> successful attempt times, seconds
+        self.retries = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def breaker(self, key):
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(key, self.failure_threshold, self.reset_seconds)
+            self.breakers[key] = breaker
+        return breaker
+
+    def hedge_delay(self, key):
+        samples = self.latencies.get(key, ())
+        if not self.hedge or len(samples) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, p95(samples))
+
+    def record_latency(self, key, seconds):
+        samples = self.latencies.get(key)
+        if samples is None:
+            samples = self.latencies[key] = deque(maxlen=500)
+        samples.append(seconds)
+
+    def backoff(self, attempt, exc):
+        # Full jitter: uniform in [0, base * 2^attempt], capped
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after(exc) or 0)
+
+    def deadline_from_now(self):
+        return asyncio.get_running_loop().time() + self.deadline
+
+    def check_deadline(self, deadline, key):
+        if deadline <= asyncio.get_running_loop().time():
+            self.timeouts += 1
+            raise UpstreamTimeout(f"No time left for upstream {key} within {self.deadline}s")
+
+    async def call(self, fn, key="groq", deadline=None):
+        # fn() returns a fresh awaitable per attempt
+        loop = asyncio.get_running_loop()
+        deadline = min(deadline or float("inf"), self.deadline_from_now())
+        self.check_deadline(deadline, key)
+        breaker = self.breaker(key)
+        breaker.allow()
+        attempt = 0
+        while True:
+            start = loop.time()
+            try:
+                result = await asyncio.wait_for(self.attempt(fn, key), deadline - start)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                breaker.failure()
+                raise UpstreamTimeout(f"Upstream {key} did not answer within {self.deadline}s")
+            except Exception as e:
+                if not is_retryable(e):
+                    breaker.release()
+                    raise
+                delay = self.backoff(attempt, e)
+                if attempt >= self.max_retries or loop.time() + delay >= deadline:
+                    breaker.failed(e)
+                    raise
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                breaker.release()  # cancelled: the client went away
+                raise
+            self.record_latency(key, loop.time() - start)
+            breaker.success()
+            return result
+
+    async def attempt(self, fn, key="groq"):
+        delay = self.hedge_delay(key)
+        if delay is None:
+            return await fn()
+
+        first = asyncio.ensure_future(fn())
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                # Slower than p95 so far: race a second request against it
+                self.hedges += 1
+                tasks.append(asyncio.ensure_future(fn()))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        return task.result()
+            return first.result()  # both failed: report the original error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def stream(self, make_stream, key="groq", deadline=None):
+        # Streams are not retried or hedged once tokens flow, but they get
+        # the breaker and the deadline (for the whole stream)
+        loop = asyncio.get_running_loop()
+        deadline = min(deadline or float("inf"), self.deadline_from_now())
+        self.check_deadline(deadline, key)
+        breaker = self.breaker(key)
+        breaker.allow()
+        chunks = make_stream().__aiter__()
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), deadline - loop.time())
+                except StopAsyncIteration:
+                    break
+                yield chunk
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            breaker.failure()
+            raise UpstreamTimeout(f"Upstream {key} did not finish within {self.deadline}s")
+        except Exception as e:
+            if is_retryable(e):
+                breaker.failed(e)
+            else:
+                breaker.release()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.success()
+
+    def stats(self):
+        return {
+            "deadline_seconds": self.deadline,
+            "max_retries": self.max_retries,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "hedging": self.hedge,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "p95_ms": {key: round(p95(samples) * 1000, 1) for key, samples in self.latencies.items()},
+            "breakers": {key: b.stats() for key, b in self.breakers.items()}
+        }
@@ -0,0 +1,89 @@
+from collections import OrderedDict
+import hashlib
+import json
+import sqlite3
+import time
+
+# ── EXACT-MATCH RESPONSE CACHE ───────────────────────
+# For stateless prompts (/rag, /agent) the answer is a pure function of the
+# inputs, so identical calls can skip Groq entirely. Two tiers:
+#   memory — OrderedDict in LRU order with a TTL per entry
+#   disk   — optional SQLite table that survives restarts
+
+def cache_key(*parts):
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    def __init__(self, max_entries=1000, ttl_seconds=3600, db_path=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.db = None
+        if db_path:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("""CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)""")
+            self.db.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+            self.db.commit()
+
+    def get(self, key):
+        now = time.time()
+        entry = self.entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self.entries[key]
+
+        if self.db is not None:
+            row = self.db.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+            if row is not None:
+                self.remember(key, row[0], row[1])
+                self.hits += 1
+                self.disk_hits += 1
+                return row[0]
+
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl_seconds
+        self.remember(key, value, expires_at)
+        if self.db is not None:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self.db.commit()
+
+    def remember(self, key, value, expires_at):
+        self.entries[key] = (expires_at, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "disk": self.db is not None
+        }
@@ -0,0 +1,87 @@
+from collections import defaultdict
+from history import count_tokens
+import math
+import re
+
+# ── TOP-K RETRIEVAL ──────────────────────────────────
+# Instead of stuffing every uploaded document into the prompt, split them
+# into chunks, score each chunk against the question and keep only the best
+# ones that fit a token budget. Scoring is day4_rag.find_relevant_chunks'
+# keyword overlap, with each shared word weighted by how rare it is across
+# the chunks (IDF) so words like "the" and "is" do not decide the ranking.
+#
+# Chunks are kept in an inverted index (word -> chunk numbers), so a query
+# only touches chunks that share a word with it, and the index can be built
+# once and saved (see collections_store.py).
+
+def tokenize(text):
+    return re.findall(r"\w+", text.lower())
+
+def split_into_chunks(documents, chunk_size=120, first_doc=0):
+    chunks = []
+    for doc_index, doc in enumerate(documents, start=first_doc):
+        words = doc.split()
+        for start in range(0, max(len(words), 1), chunk_size):
+            chunk_id = f"{doc_index}:{start // chunk_size}"
+            chunks.append((chunk_id, " ".join(words[start:start + chunk_size])))
+    return chunks
+
+class ChunkIndex:
+    def __init__(self, documents=()):
+        self.chunks = []
+        self.postings = defaultdict(list)
+        self.documents = 0
+        if documents:
+            self.add_documents(documents)
+
+    def add_documents(self, documents):
+        new_chunks = split_into_chunks(documents, first_doc=self.documents)
+        for chunk in new_chunks:
+            number = len(self.chunks)
+            self.chunks.append(chunk)
+            for term in set(tokenize(chunk[1])):
+                self.postings[term].append(number)
+        self.documents += len(documents)
+        return len(new_chunks)
+
+    def search(self, question, top_k=5, max_tokens=1500):
+        if not self.chunks:
+            return []
+        n = len(self.chunks)
+        scores = defaultdict(float)
+        for term in set(tokenize(question)):
+            matches = self.postings.get(term)
+            if matches:
+                idf = math.log(1 + n / len(matches))
+                for number in matches:
+                    scores[number] += idf
+
+        # Highest score first; ties keep document order. With no keyword
+        # match at all, fall back to the first chunk.
+        ranked = sorted(scores, key=lambda i: (-scores[i], i)) or [0]
+        selected = []
+        budget = max_tokens
+        for number in ranked:
+            if len(selected) == top_k:
+                break
+            cost = count_tokens(self.chunks[number][1])
+            if cost > budget:
+                continue
+            selected.append(self.chunks[number])
+            budget -= cost
+        return selected
+
+    def to_dict(self):
+        return {
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "postings": self.postings
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        index = cls()
+        index.documents = data["documents"]
+        index.chunks = [tuple(chunk) for chunk in data["chunks"]]
+        index.postings.update(data["postings"])
+        return index
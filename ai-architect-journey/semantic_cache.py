@@ -0,0 +1,65 @@
+import numpy as np
+
+# ── SEMANTIC CACHE ───────────────────────────────────
+# Many sessions open with near-identical questions. The caller embeds the
+# first user message (with query_embedder.QueryEmbedder, which returns unit
+# vectors); if a cached question is at least `threshold` cosine-similar, its
+# answer is reused. Vectors live in a fixed-size matrix, so a lookup is one
+# matrix-vector product. When full, the least recently used entry is
+# overwritten.
+
+def load_embedder(model_name="all-MiniLM-L6-v2"):
+    from sentence_transformers import SentenceTransformer
+    embedder = SentenceTransformer(model_name)
+    return lambda texts: embedder.encode(texts, convert_to_numpy=True)
+
+class SemanticCache:
+    def __init__(self, max_entries=1000, threshold=0.92):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.vectors = None
+        self.answers = [None] * max_entries
+        self.last_used = np.zeros(max_entries, dtype=np.int64)
+        self.size = 0
+        self.clock = 0
+        self.hits = 0
+        self.misses = 0
+        self.hit_similarity_total = 0.0
+
+    def lookup(self, vector):
+        self.clock += 1
+        if self.size:
+            similarities = self.vectors[:self.size] @ vector
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity >= self.threshold:
+                self.last_used[best] = self.clock
+                self.hits += 1
+                self.hit_similarity_total += similarity
+                return self.answers[best], similarity
+        self.misses += 1
+        return None, None
+
+    def add(self, vector, answer):
+        if self.vectors is None:
+            self.vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+        if self.size < self.max_entries:
+            slot = self.size
+            self.size += 1
+        else:
+            slot = int(np.argmin(self.last_used))
+        self.clock += 1
+        self.vectors[slot] = vector
+        self.answers[slot] = answer
+        self.last_used[slot] = self.clock
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": self.size,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "avg_hit_similarity": round(self.hit_similarity_total / self.hits, 3) if self.hits else None
+        }
@@ -0,0 +1,508 @@
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+import asyncio
+import sqlite3
+import threading
+import time
+
+# ── BOUNDED SESSION STORE ────────────────────────────
+# Replaces the old `sessions = {}` dict. Sessions live in an OrderedDict kept
+# in least-recently-used order, so lookups, touches and evictions are all
+# O(1). Three limits keep memory bounded:
+#   max_sessions — evict the least recently used session past this count
+#   ttl_seconds  — drop sessions idle for longer than this
+#   max_bytes    — evict LRU sessions while total message bytes exceed this
+# Per-session message and byte counts are kept up to date on every append.
+# Cursor pagination (see page()) needs the ids in sorted order; that list is
+# built on the first page() after sessions were created or removed, so the
+# per-request path stays O(1) and only the admin listing pays O(n log n).
+
+def message_bytes(message):
+    return len(message["role"]) + len(message["content"].encode("utf-8"))
+
+class Session:
+    def __init__(self, messages):
+        self.messages = messages
+        self.bytes = sum(message_bytes(m) for m in messages)
+        self.last_seen = time.monotonic()
+        # Rolling summary of messages[1:summarized_upto] (see history.py)
+        self.summary = ""
+        self.summarized_upto = 1
+
+class SessionStore:
+    blocking = False  # see call_store()
+
+    def __init__(self, system_prompt, max_sessions=1000, ttl_seconds=3600,
+                 max_bytes=50_000_000):
+        self.system_prompt = system_prompt
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.sessions = OrderedDict()
+        self.ids = None  # sorted ids for page(); None after any create/remove
+        self.total_bytes = 0
+        self.total_messages = 0
+        self.evictions = {"lru": 0, "ttl": 0, "bytes": 0}
+
+    def get(self, session_id):
+        self.expire()
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = Session([{"role": "system", "content": self.system_prompt}])
+            self.sessions[session_id] = session
+            self.ids = None
+            self.total_bytes += session.bytes
+            self.total_messages += len(session.messages)
+            self.evict(keep=session_id)
+        else:
+            self.sessions.move_to_end(session_id)
+            session.last_seen = time.monotonic()
+        return session.messages
+
+    def append(self, session_id, message):
+        # A session evicted while its request was in flight is not revived
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        session.messages.append(message)
+        size = message_bytes(message)
+        session.bytes += size
+        self.total_bytes += size
+        self.total_messages += 1
+        self.sessions.move_to_end(session_id)
+        session.last_seen = time.monotonic()
+        self.evict(keep=session_id)
+
+    def get_summary(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            return "", 1
+        return session.summary, session.summarized_upto
+
+    def set_summary(self, session_id, summary, summarized_upto):
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        size = len(summary.encode("utf-8")) - len(session.summary.encode("utf-8"))
+        session.summary = summary
+        session.summarized_upto = summarized_upto
+        session.bytes += size
+        self.total_bytes += size
+
+    def expire(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if session.last_seen >= cutoff:
+                break
+            self.remove(session_id)
+            self.evictions["ttl"] += 1
+
+    def evict(self, keep=None):
+        while len(self.sessions) > self.max_sessions:
+            self.remove(next(iter(self.sessions)))
+            self.evictions["lru"] += 1
+        while self.total_bytes > self.max_bytes and len(self.sessions) > 1:
+            oldest = next(iter(self.sessions))
+            if oldest == keep:
+                break
+            self.remove(oldest)
+            self.evictions["bytes"] += 1
+
+    def remove(self, session_id):
+        session = self.sessions.pop(session_id)
+        self.ids = None
+        self.total_bytes -= session.bytes
+        self.total_messages -= len(session.messages)
+
+    def __contains__(self, session_id):
+        return session_id in self.sessions
+
+    def __delitem__(self, session_id):
+        self.remove(session_id)
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def keys(self):
+        return self.sessions.keys()
+
+    def close(self):
+        pass
+
+    def page(self, cursor=None, limit=100, prefix="", include_messages=False):
+        # Sessions with id > cursor (and starting with prefix), in id order.
+        # Returns (entries, next_cursor); next_cursor is None on the last page
+        if self.ids is None:
+            self.ids = sorted(self.sessions)
+        start = bisect_right(self.ids, cursor) if cursor is not None else 0
+        start = max(start, bisect_left(self.ids, prefix))
+        end = bisect_left(self.ids, prefix_end(prefix)) if prefix else len(self.ids)
+        ids = self.ids[start:min(end, start + limit)]
+        now = time.monotonic()
+        entries = []
+        for session_id in ids:
+            session = self.sessions[session_id]
+            entry = {
+                "session_id": session_id,
+                "messages": len(session.messages),
+                "bytes": session.bytes,
+                "idle_seconds": round(now - session.last_seen, 1)
+            }
+            if include_messages:
+                entry["history"] = list(session.messages)
+            entries.append(entry)
+        next_cursor = ids[-1] if ids and start + limit < end else None
+        return entries, next_cursor
+
+    def values(self):
+        return (session.messages for session in self.sessions.values())
+
+    def stats(self):
+        return {
+            "backend": "memory",
+            "active": len(self.sessions),
+            "total_messages": self.total_messages,
+            "total_bytes": self.total_bytes,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": dict(self.evictions)
+        }
+
+def prefix_end(prefix):
+    # Smallest string greater than every string starting with prefix
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+async def call_store(method, *args):
+    # Runs a session store method from async code. SQLite writes can wait up
+    # to busy_timeout on another worker's lock, so they go to a thread; the
+    # in-memory store is cheap and is only touched from the event loop.
+    if method.__self__.blocking:
+        return await asyncio.to_thread(method, *args)
+    return method(*args)
+
+def create_session_store(backend, system_prompt, path="sessions.db", **limits):
+    if backend == "sqlite":
+        return SQLiteSessionStore(system_prompt, path=path, **limits)
+    if backend != "memory":
+        raise ValueError(f"Unknown session backend: {backend}")
+    return SessionStore(system_prompt, **limits)
+
+# ── SQLITE SESSION STORE ─────────────────────────────
+# Same interface as SessionStore, backed by a SQLite file in WAL mode so
+# several uvicorn workers (processes) share sessions. Every message is its
+# own row, so a turn is a single INSERT rather than a rewrite of the whole
+# history. Each process keeps a read-through cache of recently used
+# histories and only fetches the messages other workers appended since.
+# Every session row gets a random generation when it is created; a cached
+# history whose generation no longer matches belongs to a session that was
+# evicted (maybe by another worker) and recreated, and is refetched.
+# Limits are enforced by a sweep that runs at most every
+# maintenance_interval seconds instead of on every call.
+# Methods that write block while another worker holds the write lock, so the
+# API calls them through call_store() in a thread. Each thread gets its own
+# connection (a shared one would mix their transactions), and the history
+# cache is guarded by a lock.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    last_seen REAL NOT NULL,
+    bytes INTEGER NOT NULL,
+    message_count INTEGER NOT NULL,
+    generation INTEGER NOT NULL DEFAULT 0,
+    summary TEXT NOT NULL DEFAULT '',
+    summarized_upto INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+);
+"""
+
+class SQLiteSessionStore:
+    blocking = True
+
+    def __init__(self, system_prompt, path="sessions.db", max_sessions=1000,
+                 ttl_seconds=3600, max_bytes=50_000_000, max_cached=1000,
+                 maintenance_interval=5.0):
+        self.system_prompt = system_prompt
+        self.path = path
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_cached = max_cached
+        self.maintenance_interval = maintenance_interval
+        self.cache = OrderedDict()
+        self.generations = {}  # session id -> generation of the cached history
+        self.evictions = {"lru": 0, "ttl": 0, "bytes": 0}
+        self.last_maintenance = 0.0
+        self.lock = threading.RLock()
+        self.local = threading.local()
+        self.connections = []
+
+        self.db.executescript(SCHEMA)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(sessions)")}
+        if "generation" not in columns:
+            # Database from before generations existed
+            self.db.execute("ALTER TABLE sessions ADD COLUMN generation INTEGER NOT NULL DEFAULT 0")
+
+    @property
+    def db(self):
+        db = getattr(self.local, "db", None)
+        if db is None:
+            # isolation_level=None: autocommit, transactions are explicit below
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA busy_timeout=5000")
+            db.execute("PRAGMA foreign_keys=ON")
+            self.local.db = db
+            with self.lock:
+                self.connections.append(db)
+        return db
+
+    @contextmanager
+    def transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def count(self, session_id):
+        row = self.db.execute(
+            "SELECT message_count FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def head(self, session_id):
+        # (message_count, generation), or None if there is no such session
+        return self.db.execute(
+            "SELECT message_count, generation FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+
+    def sync(self, session_id, messages, count, generation):
+        # Bring a cached history up to `count` messages, in place, so lists
+        # already handed out see the new turns too
+        if self.generations.get(session_id) != generation or len(messages) > count:
+            messages.clear()  # the session was evicted and started over
+            self.generations[session_id] = generation
+        if len(messages) < count:
+            rows = self.db.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? AND seq >= ? ORDER BY seq",
+                (session_id, len(messages))
+            )
+            messages.extend({"role": role, "content": content} for role, content in rows)
+
+    def get(self, session_id):
+        self.maintain()
+        head = self.head(session_id)
+        if head is None:
+            system = {"role": "system", "content": self.system_prompt}
+            with self.transaction():
+                created = self.db.execute(
+                    "INSERT OR IGNORE INTO sessions (id, last_seen, bytes, message_count, generation) "
+                    "VALUES (?, ?, ?, 1, random())",
+                    (session_id, time.time(), message_bytes(system))
+                ).rowcount
+                if created:
+                    self.db.execute(
+                        "INSERT INTO messages (session_id, seq, role, content) VALUES (?, 0, ?, ?)",
+                        (session_id, system["role"], system["content"])
+                    )
+            head = self.head(session_id)
+        count, generation = head
+
+        with self.lock:
+            messages = self.cache.get(session_id)
+            if messages is None:
+                messages = []
+                self.cache[session_id] = messages
+                while len(self.cache) > self.max_cached:
+                    self.forget(next(iter(self.cache)))
+            else:
+                self.cache.move_to_end(session_id)
+            self.sync(session_id, messages, count, generation)
+        return messages
+
+    def forget(self, session_id):
+        with self.lock:
+            self.cache.pop(session_id, None)
+            self.generations.pop(session_id, None)
+
+    def append(self, session_id, message):
+        with self.transaction():
+            head = self.head(session_id)
+            if head is None:
+                return  # evicted while the request was in flight
+            seq, generation = head
+            self.db.execute(
+                "INSERT INTO messages (session_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                (session_id, seq, message["role"], message["content"])
+            )
+            self.db.execute(
+                "UPDATE sessions SET message_count = ?, bytes = bytes + ?, last_seen = ? WHERE id = ?",
+                (seq + 1, message_bytes(message), time.time(), session_id)
+            )
+        with self.lock:
+            messages = self.cache.get(session_id)
+            if messages is not None:
+                if len(messages) == seq and self.generations.get(session_id) == generation:
+                    messages.append(message)
+                else:
+                    self.sync(session_id, messages, seq + 1, generation)
+
+    def get_summary(self, session_id):
+        row = self.db.execute(
+            "SELECT summary, summarized_upto FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        return ("", 1) if row is None else row
+
+    def set_summary(self, session_id, summary, summarized_upto):
+        self.db.execute(
+            "UPDATE sessions SET bytes = bytes + ? - length(CAST(summary AS BLOB)), "
+            "summary = ?, summarized_upto = ? WHERE id = ?",
+            (len(summary.encode("utf-8")), summary, summarized_upto, session_id)
+        )
+
+    def maintain(self):
+        now = time.time()
+        with self.lock:
+            if now - self.last_maintenance < self.maintenance_interval:
+                return
+            self.last_maintenance = now
+        with self.transaction():
+            # Ids are selected first (inside the same transaction) so they can
+            # also be dropped from this worker's cache
+            expired = self.db.execute(
+                "SELECT id FROM sessions WHERE last_seen < ?", (now - self.ttl_seconds,)
+            ).fetchall()
+            self.db.executemany("DELETE FROM sessions WHERE id = ?", expired)
+            self.evictions["ttl"] += len(expired)
+
+            evicted = []
+            over = self.db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] - self.max_sessions
+            if over > 0:
+                evicted = self.db.execute(
+                    "SELECT id FROM sessions ORDER BY last_seen LIMIT ?", (over,)
+                ).fetchall()
+                self.db.executemany("DELETE FROM sessions WHERE id = ?", evicted)
+                self.evictions["lru"] += len(evicted)
+
+            excess = self.db.execute("SELECT COALESCE(SUM(bytes), 0) FROM sessions").fetchone()[0] - self.max_bytes
+            if excess > 0:
+                doomed = []
+                for session_id, size in self.db.execute(
+                        "SELECT id, bytes FROM sessions ORDER BY last_seen"):
+                    if excess <= 0:
+                        break
+                    doomed.append((session_id,))
+                    excess -= size
+                self.db.executemany("DELETE FROM sessions WHERE id = ?", doomed)
+                self.evictions["bytes"] += len(doomed)
+                evicted += doomed
+        for (session_id,) in expired + evicted:
+            self.forget(session_id)
+
+    def expire(self):
+        self.maintain()
+
+    def remove(self, session_id):
+        self.db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        self.forget(session_id)
+
+    def __contains__(self, session_id):
+        return self.count(session_id) is not None
+
+    def __delitem__(self, session_id):
+        self.remove(session_id)
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def keys(self):
+        return [row[0] for row in self.db.execute("SELECT id FROM sessions ORDER BY last_seen")]
+
+    def values(self):
+        for session_id in self.keys():
+            yield [
+                {"role": role, "content": content}
+                for role, content in self.db.execute(
+                    "SELECT role, content FROM messages WHERE session_id = ? ORDER BY seq",
+                    (session_id,)
+                )
+            ]
+
+    def page(self, cursor=None, limit=100, prefix="", include_messages=False):
+        # Keyset pagination on the primary key: each page is an index range
+        # scan, however many sessions there are
+        where, params = [], []
+        if cursor is not None:
+            where.append("id > ?")
+            params.append(cursor)
+        if prefix:
+            where.append("id >= ? AND id < ?")
+            params += [prefix, prefix_end(prefix)]
+        sql = "SELECT id, message_count, bytes, last_seen FROM sessions"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        rows = self.db.execute(sql + " ORDER BY id LIMIT ?", params + [limit + 1]).fetchall()
+
+        now = time.time()
+        entries = [
+            {
+                "session_id": session_id,
+                "messages": count,
+                "bytes": size,
+                "idle_seconds": round(now - last_seen, 1)
+            }
+            for session_id, count, size, last_seen in rows[:limit]
+        ]
+        if include_messages and entries:
+            histories = {entry["session_id"]: [] for entry in entries}
+            placeholders = ",".join("?" * len(histories))
+            for session_id, role, content in self.db.execute(
+                    f"SELECT session_id, role, content FROM messages "
+                    f"WHERE session_id IN ({placeholders}) ORDER BY session_id, seq",
+                    list(histories)):
+                histories[session_id].append({"role": role, "content": content})
+            for entry in entries:
+                entry["history"] = histories[entry["session_id"]]
+        next_cursor = entries[-1]["session_id"] if len(rows) > limit else None
+        return entries, next_cursor
+
+    @property
+    def total_messages(self):
+        return self.db.execute("SELECT COALESCE(SUM(message_count), 0) FROM sessions").fetchone()[0]
+
+    @property
+    def total_bytes(self):
+        return self.db.execute("SELECT COALESCE(SUM(bytes), 0) FROM sessions").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            for db in self.connections:
+                db.close()
+            self.connections.clear()
+
+    def stats(self):
+        return {
+            "backend": "sqlite",
+            "active": len(self),
+            "cached": len(self.cache),
+            "total_messages": self.total_messages,
+            "total_bytes": self.total_bytes,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": dict(self.evictions)
+        }
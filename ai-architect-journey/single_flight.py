@@ -0,0 +1,65 @@
+from concurrent.futures import Future
+import asyncio
+import threading
+
+# ── SINGLE-FLIGHT ────────────────────────────────────
+# Identical calls that arrive while one is already in flight wait for that
+# call's result instead of starting their own upstream request.
+#   await flight.do(key, coroutine_fn)    — async callers
+#   flight.do_sync(key, fn)               — sync callers (threads)
+# The shared async call runs as its own task, so a caller that disconnects
+# does not cancel the result the others are waiting on.
+
+class SingleFlight:
+    def __init__(self):
+        self.calls = {}
+        self.sync_calls = {}
+        self.lock = threading.Lock()
+        self.leaders = 0
+        self.collapsed = 0
+
+    async def do(self, key, fn):
+        task = self.calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self.calls[key] = task
+            task.add_done_callback(lambda done: self.forget(self.calls, key, done))
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task)
+
+    def do_sync(self, key, fn):
+        with self.lock:
+            future = self.sync_calls.get(key)
+            leader = future is None
+            if leader:
+                self.leaders += 1
+                future = Future()
+                self.sync_calls[key] = future
+            else:
+                self.collapsed += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.forget(self.sync_calls, key, future)
+
+    def forget(self, calls, key, call):
+        if calls.get(key) is call:
+            del calls[key]
+
+    def stats(self):
+        return {
+            "in_flight": len(self.calls) + len(self.sync_calls),
+            "upstream_calls": self.leaders,
+            "collapsed": self.collapsed
+        }
@@ -0,0 +1,58 @@
+import numpy as np
+
+# ── VECTOR INDEX ─────────────────────────────────────
+# Exact cosine search for day9_vectorrag.py. Document vectors are normalized
+# once when they are added, so a query is a single matrix-vector product
+# (cosine = dot product of unit vectors). Top-k uses np.argpartition, O(N),
+# and only the k winners are sorted, instead of argsort over every score.
+# search_many() scores a whole batch of queries with one matrix multiply.
+# from_normalized() wraps vectors that are already unit length, e.g. the
+# memory-mapped matrix from embedding_store.py, without copying them.
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / (norms + 1e-10)
+
+def top_k(scores, k):
+    # Indices of the k highest scores (last axis), best first
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.int64)
+    if k < scores.shape[-1]:
+        candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        candidates = np.broadcast_to(np.arange(k), scores.shape[:-1] + (k,))
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=-1), axis=-1)
+    return np.take_along_axis(candidates, order, axis=-1)
+
+class VectorIndex:
+    def __init__(self, vectors=None):
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        if vectors is not None and len(vectors):
+            self.add(vectors)
+
+    @classmethod
+    def from_normalized(cls, vectors):
+        index = cls()
+        index.vectors = vectors
+        return index
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def add(self, vectors):
+        vectors = normalize(vectors)
+        self.vectors = vectors if not len(self.vectors) else np.vstack([self.vectors, vectors])
+
+    def search(self, query, k=3):
+        # Returns (indices, similarities), best first
+        scores = self.vectors @ normalize(query).reshape(-1)
+        indices = top_k(scores, k)
+        return indices, scores[indices]
+
+    def search_many(self, queries, k=3):
+        # queries: (Q, dim) -> indices and similarities, each (Q, k)
+        scores = normalize(queries) @ self.vectors.T
+        indices = top_k(scores, k)
+        return indices, np.take_along_axis(scores, indices, axis=1)